@@ -0,0 +1,133 @@
+"""Shared startup helpers for the facial emotion apps.
+
+Checks dependencies without importing them, verifies the face landmarker
+model by hash, and creates MediaPipe landmarkers on a background thread so
+the camera and UI can come up while the model loads.
+"""
+import hashlib
+import importlib.util
+import os
+import subprocess
+import sys
+import threading
+import urllib.request
+
+
+MODEL_PATH = "face_landmarker.task"
+MODEL_URL = "https://storage.googleapis.com/mediapipe-models/face_landmarker/face_landmarker/float16/1/face_landmarker.task"
+MODEL_SHA256 = "64184e229b263107bc2b804c6625db1341ff2bb731874b0bcc2fe6544e0bc9ff"
+
+REQUIRED_PACKAGES = [
+    ("opencv-python", "cv2"),
+    ("mediapipe", "mediapipe"),
+    ("numpy", "numpy"),
+]
+
+_checked_modules = set()
+_model_lock = threading.Lock()
+_verified_models = set()
+
+
+def ensure_dependencies(packages=REQUIRED_PACKAGES):
+    """Install any missing packages.
+
+    Modules are probed with importlib.util.find_spec, which locates them
+    without running their import, and each module is only checked once per
+    process.
+    """
+    missing = []
+    for pkg, module in packages:
+        if module in _checked_modules:
+            continue
+        if importlib.util.find_spec(module) is None:
+            missing.append(pkg)
+
+    if missing:
+        print(f"Installing missing packages: {', '.join(missing)}")
+        result = subprocess.run([sys.executable, "-m", "pip", "install", *missing])
+        if result.returncode != 0:
+            print("Package installation failed. Please install manually and retry.")
+            sys.exit(1)
+        importlib.invalidate_caches()
+
+    _checked_modules.update(module for _, module in packages)
+
+
+def _sha256(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def ensure_model(path=MODEL_PATH):
+    """Make sure the face landmarker model exists and matches MODEL_SHA256.
+
+    Downloads the model if it is missing or corrupt. Safe to call from
+    several threads at once.
+    """
+    with _model_lock:
+        if path in _verified_models:
+            return path
+
+        if os.path.exists(path):
+            if _sha256(path) == MODEL_SHA256:
+                _verified_models.add(path)
+                return path
+            print("⚠ Face landmarker model failed integrity check, downloading again...")
+        else:
+            print("Downloading face landmarker model...")
+
+        partial_path = path + ".part"
+        urllib.request.urlretrieve(MODEL_URL, partial_path)
+        if _sha256(partial_path) != MODEL_SHA256:
+            os.remove(partial_path)
+            raise RuntimeError("Downloaded face landmarker model does not match the expected hash")
+        os.replace(partial_path, path)
+        print("✓ Model downloaded")
+
+        _verified_models.add(path)
+        return path
+
+
+class LazyLandmarker:
+    """MediaPipe FaceLandmarker that is created on a background thread.
+
+    Construction returns immediately. The first attribute access (for
+    example detect_for_video) blocks until the model has loaded.
+    """
+
+    def __init__(self, model_path=MODEL_PATH, **options):
+        """Start loading a landmarker with the given FaceLandmarkerOptions."""
+        self._model_path = model_path
+        self._options = options
+        self._landmarker = None
+        self._error = None
+        self._ready = threading.Event()
+        threading.Thread(target=self._load, daemon=True).start()
+
+    def _load(self):
+        try:
+            import mediapipe as mp
+
+            base_options = mp.tasks.BaseOptions(model_asset_path=ensure_model(self._model_path))
+            options = mp.tasks.vision.FaceLandmarkerOptions(
+                base_options=base_options,
+                **self._options
+            )
+            self._landmarker = mp.tasks.vision.FaceLandmarker.create_from_options(options)
+        except Exception as e:
+            self._error = e
+        finally:
+            self._ready.set()
+
+    def get(self):
+        """Return the landmarker, waiting for it to finish loading."""
+        self._ready.wait()
+        if self._error is not None:
+            raise self._error
+        return self._landmarker
+
+    def __getattr__(self, name):
+        return getattr(self.get(), name)
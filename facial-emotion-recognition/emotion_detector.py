@@ -4,33 +4,12 @@
 Detects emotions (Happy, Sad, Surprised, Angry, Neutral) instantly based on facial geometry.
 Much faster than LLM analysis - works in real-time!
 """
-import importlib
-import subprocess
-import sys
 import json
 from datetime import datetime
 import math
+import time
 
-
-def ensure_dependencies():
-    missing = []
-    for pkg, module in [
-        ("opencv-python", "cv2"),
-        ("mediapipe", "mediapipe"),
-        ("numpy", "numpy"),
-    ]:
-        try:
-            importlib.import_module(module)
-        except ImportError:
-            missing.append(pkg)
-
-    if missing:
-        print(f"Installing missing packages: {', '.join(missing)}")
-        result = subprocess.run([sys.executable, "-m", "pip", "install", *missing])
-        if result.returncode != 0:
-            print("Package installation failed. Please install manually and retry.")
-            sys.exit(1)
-
+from bootstrap import LazyLandmarker, ensure_dependencies
 
 ensure_dependencies()
 
@@ -38,6 +17,8 @@ import cv2
 import mediapipe as mp
 import numpy as np
 
+from landmark_filter import LandmarkFilter
+
 
 class EmotionDetector:
     """Real-time emotion detection from facial landmarks."""
@@ -45,6 +26,7 @@ class EmotionDetector:
     def __init__(self, use_calibration=True):
         """Initialize the detector."""
         self.detector = self._setup_face_landmarker()
+        self.landmark_filter = LandmarkFilter()
         self.calibration = None
         self.using_calibration = False
         
@@ -82,21 +64,8 @@ class EmotionDetector:
         return calibrated_value
         
     def _setup_face_landmarker(self):
-        """Setup MediaPipe face landmarker."""
-        import os
-        import urllib.request
-        
-        model_path = "face_landmarker.task"
-        
-        if not os.path.exists(model_path):
-            print("Downloading face landmarker model...")
-            url = "https://storage.googleapis.com/mediapipe-models/face_landmarker/face_landmarker/float16/1/face_landmarker.task"
-            urllib.request.urlretrieve(url, model_path)
-            print("✓ Model downloaded")
-        
-        base_options = mp.tasks.BaseOptions(model_asset_path=model_path)
-        options = mp.tasks.vision.FaceLandmarkerOptions(
-            base_options=base_options,
+        """Setup MediaPipe face landmarker (loads in the background)."""
+        return LazyLandmarker(
             output_face_blendshapes=False,
             output_facial_transformation_matrixes=False,
             num_faces=1,
@@ -105,7 +74,6 @@ class EmotionDetector:
             min_tracking_confidence=0.5,
             running_mode=mp.tasks.vision.RunningMode.VIDEO
         )
-        return mp.tasks.vision.FaceLandmarker.create_from_options(options)
     
     def calculate_distance(self, point1, point2):
         """Calculate Euclidean distance between two points."""
@@ -395,7 +363,8 @@ class EmotionDetector:
             
             if result.face_landmarks:
                 for face_landmarks in result.face_landmarks:
-                    # Detect emotion
+                    # Smooth landmark jitter, then detect emotion
+                    face_landmarks = self.landmark_filter(face_landmarks, time.perf_counter())
                     emotion_data = self.detect_emotion(face_landmarks)
                     emotion_history.append(emotion_data["emotion"])
                     if len(emotion_history) > 30:
@@ -477,6 +446,7 @@ class EmotionDetector:
                     break  # Only process first face
             else:
                 # No face detected
+                self.landmark_filter.reset()
                 cv2.putText(display, "STATUS:", (info_x, info_y),
                            cv2.FONT_HERSHEY_SIMPLEX, 0.6, (150, 150, 150), 2)
                 cv2.putText(display, "No face detected", (info_x, info_y + 50),
@@ -3,34 +3,12 @@
 
 Captures your facial metrics for each emotion to create a personalized profile.
 """
-import importlib
-import subprocess
-import sys
 import json
 from datetime import datetime
 import math
-import os
-
-
-def ensure_dependencies():
-    missing = []
-    for pkg, module in [
-        ("opencv-python", "cv2"),
-        ("mediapipe", "mediapipe"),
-        ("numpy", "numpy"),
-    ]:
-        try:
-            importlib.import_module(module)
-        except ImportError:
-            missing.append(pkg)
-
-    if missing:
-        print(f"Installing missing packages: {', '.join(missing)}")
-        result = subprocess.run([sys.executable, "-m", "pip", "install", *missing])
-        if result.returncode != 0:
-            print("Package installation failed. Please install manually and retry.")
-            sys.exit(1)
+import time
 
+from bootstrap import LazyLandmarker, ensure_dependencies
 
 ensure_dependencies()
 
@@ -38,6 +16,8 @@ import cv2
 import mediapipe as mp
 import numpy as np
 
+from landmark_filter import LandmarkFilter
+
 
 class EmotionTrainer:
     """Collect training data for personalized emotion detection."""
@@ -45,6 +25,7 @@ class EmotionTrainer:
     def __init__(self):
         """Initialize the trainer."""
         self.detector = self._setup_face_landmarker()
+        self.landmark_filter = LandmarkFilter()
         self.training_data = []
         self.emotions_to_train = [
             "Neutral", "Happy", "Sad", "Angry", 
@@ -53,19 +34,8 @@ class EmotionTrainer:
         self.current_emotion_index = 0
         
     def _setup_face_landmarker(self):
-        """Setup MediaPipe face landmarker."""
-        import urllib.request
-        
-        model_path = "face_landmarker.task"
-        if not os.path.exists(model_path):
-            print("Downloading face landmarker model...")
-            url = "https://storage.googleapis.com/mediapipe-models/face_landmarker/face_landmarker/float16/1/face_landmarker.task"
-            urllib.request.urlretrieve(url, model_path)
-            print("✓ Model downloaded")
-        
-        base_options = mp.tasks.BaseOptions(model_asset_path=model_path)
-        options = mp.tasks.vision.FaceLandmarkerOptions(
-            base_options=base_options,
+        """Setup MediaPipe face landmarker (loads in the background)."""
+        return LazyLandmarker(
             output_face_blendshapes=False,
             output_facial_transformation_matrixes=False,
             num_faces=1,
@@ -74,7 +44,6 @@ class EmotionTrainer:
             min_tracking_confidence=0.5,
             running_mode=mp.tasks.vision.RunningMode.VIDEO
         )
-        return mp.tasks.vision.FaceLandmarker.create_from_options(options)
     
     def calculate_distance(self, point1, point2):
         """Calculate Euclidean distance between two points."""
@@ -215,6 +184,14 @@ class EmotionTrainer:
             
             result = self.detector.detect_for_video(mp_image, timestamp_ms)
             
+            # Smooth landmark jitter exactly as the detector does, so the
+            # calibration is measured on the same input it is compared with
+            if result.face_landmarks:
+                filtered_faces = [self.landmark_filter(result.face_landmarks[0], time.perf_counter())]
+            else:
+                filtered_faces = []
+                self.landmark_filter.reset()
+            
             # Create main display (1280x720)
             display_w, display_h = 1280, 720
             display = np.zeros((display_h, display_w, 3), dtype=np.uint8)
@@ -343,7 +320,7 @@ class EmotionTrainer:
                 # Capture sample
                 self.mouse_clicked = False  # Reset click
                 
-                for face_landmarks in result.face_landmarks:
+                for face_landmarks in filtered_faces:
                     metrics = self.extract_metrics(face_landmarks)
                     if metrics:
                         sample = {
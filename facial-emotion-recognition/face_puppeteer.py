@@ -3,32 +3,15 @@ Face Puppeteer - Control a photo with your face movements
 Uses MediaPipe to map your facial movements to an imported image
 """
 
-import importlib
-import subprocess
+import queue
 import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 import os
 
-
-def ensure_dependencies():
-    missing = []
-    for pkg, module in [
-        ("opencv-python", "cv2"),
-        ("mediapipe", "mediapipe"),
-        ("numpy", "numpy"),
-    ]:
-        try:
-            importlib.import_module(module)
-        except ImportError:
-            missing.append(pkg)
-
-    if missing:
-        print(f"Installing missing packages: {', '.join(missing)}")
-        result = subprocess.run([sys.executable, "-m", "pip", "install", *missing])
-        if result.returncode != 0:
-            print("Package installation failed. Please install manually and retry.")
-            sys.exit(1)
-
+from bootstrap import LazyLandmarker, ensure_dependencies
 
 ensure_dependencies()
 
@@ -36,19 +19,93 @@ import cv2
 import mediapipe as mp
 import numpy as np
 
+from landmark_filter import LandmarkFilter
+
+
+class WarpWorker:
+    """Run facial warping on a background thread.
+
+    Only the most recent source landmarks are kept; older submissions are
+    dropped so the worker never falls behind the camera. The average warp
+    time is tracked so the caller can adapt how often it submits work.
+    """
+
+    def __init__(self, puppeteer):
+        self.puppeteer = puppeteer
+        self.latest_result = None
+        self.warp_time = 0.0  # Smoothed warp duration in seconds
+        self._pending = None
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._running = False
+        self._thread = None
+
+    def start(self):
+        """Start the background warp thread."""
+        self._running = True
+        self._thread = threading.Thread(target=self._loop, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop the background warp thread and wait for it to finish."""
+        self._running = False
+        self._wakeup.set()
+        if self._thread is not None:
+            self._thread.join(timeout=2.0)
+            self._thread = None
+
+    def submit(self, source_landmarks):
+        """Queue landmarks for warping, replacing any not yet picked up."""
+        with self._lock:
+            self._pending = source_landmarks
+        self._wakeup.set()
+
+    def _loop(self):
+        while self._running:
+            self._wakeup.wait()
+            with self._lock:
+                source_landmarks = self._pending
+                self._pending = None
+                self._wakeup.clear()
+            if source_landmarks is None or not self._running:
+                continue
+
+            start = time.perf_counter()
+            try:
+                animated = self.puppeteer.apply_facial_expression(
+                    source_landmarks,
+                    self.puppeteer.target_image,
+                    self.puppeteer.target_landmarks
+                )
+            except Exception as e:
+                print(f"⚠ Warp failed: {e}")
+                continue
+            elapsed = time.perf_counter() - start
+
+            # Exponential moving average keeps the skip rate from oscillating
+            if self.warp_time == 0.0:
+                self.warp_time = elapsed
+            else:
+                self.warp_time = 0.8 * self.warp_time + 0.2 * elapsed
+            self.latest_result = animated
+
+
 class FacePuppeteer:
     def __init__(self):
         """Initialize the face puppeteer."""
-        # Initialize MediaPipe Face Landmarker
-        base_options = mp.tasks.BaseOptions(
-            model_asset_path='face_landmarker.task'
-        )
-        options = mp.tasks.vision.FaceLandmarkerOptions(
-            base_options=base_options,
+        # Load MediaPipe Face Landmarkers in the background: video mode for
+        # the camera and image mode for the target photo
+        self.detector = LazyLandmarker(
             running_mode=mp.tasks.vision.RunningMode.VIDEO,
             num_faces=1
         )
-        self.detector = mp.tasks.vision.FaceLandmarker.create_from_options(options)
+        self.image_detector = LazyLandmarker(
+            running_mode=mp.tasks.vision.RunningMode.IMAGE,
+            num_faces=1
+        )
+        
+        # Smooths camera landmarks before they drive the warp
+        self.landmark_filter = LandmarkFilter()
         
         # Target image and landmarks
         self.target_image = None
@@ -78,14 +135,7 @@ class FacePuppeteer:
         mp_image = mp.Image(image_format=mp.ImageFormat.SRGB, data=rgb_image)
         
         # Use image mode for static image
-        base_options = mp.tasks.BaseOptions(model_asset_path='face_landmarker.task')
-        options = mp.tasks.vision.FaceLandmarkerOptions(
-            base_options=base_options,
-            running_mode=mp.tasks.vision.RunningMode.IMAGE,
-            num_faces=1
-        )
-        image_detector = mp.tasks.vision.FaceLandmarker.create_from_options(options)
-        result = image_detector.detect(mp_image)
+        result = self.image_detector.detect(mp_image)
         
         if not result.face_landmarks:
             print("❌ No face detected in target image")
@@ -135,7 +185,11 @@ class FacePuppeteer:
         return rect[0] <= point[0] < rect[0] + rect[2] and rect[1] <= point[1] < rect[1] + rect[3]
     
     def warp_triangle(self, img1, img2, t1, t2):
-        """Warp triangle from img1 to img2 (optimized)."""
+        """Warp triangle from img1 to img2 in place.
+        
+        Both images are uint8; the triangle is composited through a
+        single-channel mask with cv2.copyTo, so no float conversion is needed.
+        """
         try:
             r1 = cv2.boundingRect(np.float32([t1]))
             r2 = cv2.boundingRect(np.float32([t2]))
@@ -156,9 +210,9 @@ class FacePuppeteer:
                 t1_rect.append(((t1[i][0] - r1[0]), (t1[i][1] - r1[1])))
                 t2_rect.append(((t2[i][0] - r2[0]), (t2[i][1] - r2[1])))
             
-            # Get mask
-            mask = np.zeros((r2[3], r2[2], 3), dtype=np.float32)
-            cv2.fillConvexPoly(mask, np.int32(t2_rect), (1.0, 1.0, 1.0), 16, 0)
+            # Get mask (single channel, hard edges so neighbouring triangles tile exactly)
+            mask = np.zeros((r2[3], r2[2]), dtype=np.uint8)
+            cv2.fillConvexPoly(mask, np.int32(t2_rect), 255, cv2.LINE_8, 0)
             
             # Get image rect
             img1_rect = img1[r1[1]:r1[1] + r1[3], r1[0]:r1[0] + r1[2]]
@@ -171,23 +225,22 @@ class FacePuppeteer:
             img2_rect = cv2.warpAffine(img1_rect, warp_mat, (r2[2], r2[3]), 
                                        None, cv2.INTER_LINEAR, cv2.BORDER_REFLECT_101)
             
-            # Apply mask and blend
-            img2_rect = img2_rect * mask
-            img2[r2[1]:r2[1]+r2[3], r2[0]:r2[0]+r2[2]] = \
-                img2[r2[1]:r2[1]+r2[3], r2[0]:r2[0]+r2[2]] * ((1.0, 1.0, 1.0) - mask) + img2_rect
+            # Copy the masked triangle into the output region
+            roi = img2[r2[1]:r2[1]+r2[3], r2[0]:r2[0]+r2[2]]
+            roi[:] = cv2.copyTo(img2_rect, mask, roi)
         except Exception as e:
             # Silently skip problematic triangles
             pass
     
-    def apply_facial_expression(self, source_landmarks, target_image, target_landmarks):
+    def apply_facial_expression(self, source_landmarks, target_image, target_landmarks, max_width=800):
         """Apply source facial expression to target image using fast simplified warping.
         Maps key facial landmarks from source (your camera) to target (image face).
+        Pass max_width=None to warp at the full target resolution.
         """
         h, w = target_image.shape[:2]
         
-        # Resize for faster processing (max 800px width)
-        max_width = 800
-        if w > max_width:
+        # Resize for faster processing (max 800px width by default)
+        if max_width and w > max_width:
             scale = max_width / w
             new_w, new_h = int(w * scale), int(h * scale)
             target_resized = cv2.resize(target_image, (new_w, new_h))
@@ -261,8 +314,8 @@ class FacePuppeteer:
         # Get triangulation
         triangles = self.get_delaunay_triangles(target_points, new_w, new_h)
         
-        # Create output
-        result = target_resized.astype(np.float32)
+        # Create output (uint8 throughout, warped in place)
+        result = target_resized.copy()
         
         # Warp each triangle (limit iterations for speed)
         for idx, indices in enumerate(triangles):
@@ -270,18 +323,161 @@ class FacePuppeteer:
                 try:
                     t1 = [target_points[i] for i in indices]
                     t2 = [warped_points[i] for i in indices]
-                    self.warp_triangle(target_resized.astype(np.float32), result, t1, t2)
+                    self.warp_triangle(target_resized, result, t1, t2)
                 except:
                     pass
         
-        result = np.uint8(np.clip(result, 0, 255))
-        
         # Upscale back if needed
         if scale != 1.0:
             result = cv2.resize(result, (w, h))
         
         return result
     
+    def export_video(self, driver_path, image_path, output_path, workers=None):
+        """Render a driver video onto the target image and save it as MP4.
+        
+        Decoding, landmark detection, warping and encoding run as separate
+        stages connected by bounded queues. Warps are spread over a thread
+        pool (OpenCV releases the GIL) and written back in frame order.
+        """
+        if not self.load_target_image(image_path):
+            return False
+        
+        cap = cv2.VideoCapture(driver_path)
+        if not cap.isOpened():
+            print(f"❌ Could not open video: {driver_path}")
+            return False
+        
+        fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
+        total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        h, w = self.target_image.shape[:2]
+        writer = cv2.VideoWriter(output_path, cv2.VideoWriter_fourcc(*'mp4v'), fps, (w, h))
+        if not writer.isOpened():
+            print(f"❌ Could not create output video: {output_path}")
+            cap.release()
+            return False
+        
+        workers = workers or os.cpu_count() or 2
+        frames = queue.Queue(maxsize=workers * 2)
+        warps = queue.Queue(maxsize=workers * 2)
+        pool = ThreadPoolExecutor(max_workers=workers)
+        stop = threading.Event()
+        
+        print(f"\n🎬 Rendering {driver_path} -> {output_path}")
+        print(f"  {w}x{h} @ {fps:.1f} FPS, {workers} warp workers")
+        
+        # Stages pass None when done, or the exception that stopped them.
+        # Once `stop` is set nobody reads the queues, so puts and gets give up.
+        def put(q, item):
+            while not stop.is_set():
+                try:
+                    q.put(item, timeout=0.1)
+                    return True
+                except queue.Full:
+                    pass
+            return False
+        
+        def get(q):
+            while not stop.is_set():
+                try:
+                    return q.get(timeout=0.1)
+                except queue.Empty:
+                    pass
+            return None
+        
+        def decode():
+            index = 0
+            try:
+                while not stop.is_set():
+                    success, frame = cap.read()
+                    if not success:
+                        break
+                    if not put(frames, (index, frame)):
+                        return
+                    index += 1
+            except Exception as e:
+                put(frames, e)
+                return
+            put(frames, None)
+        
+        def detect():
+            last_landmarks = None
+            landmark_filter = LandmarkFilter()
+            try:
+                while True:
+                    item = get(frames)
+                    if item is None or isinstance(item, Exception):
+                        put(warps, item)
+                        return
+                    index, frame = item
+                    
+                    rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+                    mp_image = mp.Image(image_format=mp.ImageFormat.SRGB, data=rgb_frame)
+                    result = self.detector.detect_for_video(mp_image, int(index * 1000 / fps))
+                    
+                    # Hold the last seen expression through frames without a face
+                    if result.face_landmarks:
+                        last_landmarks = landmark_filter(result.face_landmarks[0], index / fps)
+                    
+                    if last_landmarks is None:
+                        future = pool.submit(self.target_image.copy)
+                    else:
+                        future = pool.submit(
+                            self.apply_facial_expression,
+                            last_landmarks,
+                            self.target_image,
+                            self.target_landmarks,
+                            None
+                        )
+                    if not put(warps, future):
+                        return
+            except Exception as e:
+                # Model load and detection errors end the export
+                put(warps, e)
+        
+        stages = [threading.Thread(target=decode, daemon=True),
+                  threading.Thread(target=detect, daemon=True)]
+        for stage in stages:
+            stage.start()
+        
+        # Encode on this thread, in submission order
+        start = time.perf_counter()
+        written = 0
+        error = None
+        try:
+            while True:
+                future = warps.get()
+                if future is None:
+                    break
+                if isinstance(future, Exception):
+                    raise future
+                writer.write(future.result())
+                written += 1
+                if written % 30 == 0:
+                    progress = f"{written}/{total_frames}" if total_frames > 0 else str(written)
+                    print(f"  Frame {progress}")
+        except Exception as e:
+            error = e
+        finally:
+            stop.set()
+            for stage in stages:
+                stage.join(timeout=2.0)
+            pool.shutdown(wait=True)
+            cap.release()
+            writer.release()
+        
+        if error is not None:
+            print(f"❌ Export failed after {written} frames: {error}")
+            # Don't leave a truncated video that looks complete
+            if os.path.exists(output_path):
+                os.remove(output_path)
+            return False
+        
+        elapsed = time.perf_counter() - start
+        print(f"✓ Wrote {written} frames to {output_path} in {elapsed:.1f}s "
+              f"({written / max(elapsed, 1e-6):.1f} FPS)")
+        return True
+    
     def mouse_callback(self, event, x, y, flags, param):
         """Handle mouse events."""
         self.mouse_x = x
@@ -331,12 +527,16 @@ class FacePuppeteer:
         
         frame_count = 0
         display_mode = 3  # 1=original, 2=animated, 3=side-by-side
-        last_animated = None  # Cache last animated result
-        process_every = 2  # Process every N frames for speed
+        process_every = 1  # Submit every N frames, adapted to warp time
+        frame_interval = 1.0 / 30  # Smoothed camera frame interval in seconds
+        last_frame_time = time.perf_counter()
         fps_time = datetime.now()
         fps_counter = 0
         current_fps = 0
         
+        warper = WarpWorker(self)
+        warper.start()
+        
         cv2.namedWindow('Face Puppeteer')
         cv2.setMouseCallback('Face Puppeteer', self.mouse_callback)
         
@@ -349,6 +549,10 @@ class FacePuppeteer:
             fps_counter += 1
             camera_frame = cv2.flip(camera_frame, 1)
             
+            now = time.perf_counter()
+            frame_interval = 0.9 * frame_interval + 0.1 * (now - last_frame_time)
+            last_frame_time = now
+            
             # Calculate FPS
             if (datetime.now() - fps_time).total_seconds() >= 1.0:
                 current_fps = fps_counter
@@ -375,21 +579,20 @@ class FacePuppeteer:
             display[:] = (40, 40, 40)
             
             if result.face_landmarks and len(result.face_landmarks) > 0:
-                source_landmarks = result.face_landmarks[0]
+                source_landmarks = self.landmark_filter(result.face_landmarks[0], now)
                 
-                # Only process warping every N frames for better performance
+                # Skip enough frames to match the measured warp time so the
+                # worker is never handed more than it can finish
+                if warper.warp_time > 0:
+                    process_every = max(1, int(np.ceil(warper.warp_time / max(frame_interval, 1e-3))))
                 if frame_count % process_every == 0:
-                    # Apply facial expression warping
-                    animated_image = self.apply_facial_expression(
-                        source_landmarks, 
-                        self.target_image.copy(), 
-                        self.target_landmarks
-                    )
-                    last_animated = animated_image
-                elif last_animated is not None:
-                    animated_image = last_animated
-                else:
-                    animated_image = self.target_image.copy()
+                    # Extrapolate to when the warp will be ready to hide its latency
+                    warper.submit(self.landmark_filter.predict(now + warper.warp_time))
+                
+                # Show the most recent completed warp
+                animated_image = warper.latest_result
+                if animated_image is None:
+                    animated_image = self.target_image
                 
                 # Resize for display
                 target_h, target_w = self.target_image.shape[:2]
@@ -437,8 +640,12 @@ class FacePuppeteer:
                            (10, 120), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 2)
                 cv2.putText(display, "Status: ACTIVE", (10, 150),
                            cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 255, 0), 2)
+                cv2.putText(display, f"Warp: {warper.warp_time * 1000:.0f} ms (every {process_every})",
+                           (10, 180), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 0), 2)
                 
             else:
+                self.landmark_filter.reset()
+                
                 # Show camera feed even when no face detected
                 camera_resized = cv2.resize(camera_frame, (500, 375))
                 display[50:425, 390:890] = camera_resized
@@ -474,10 +681,36 @@ class FacePuppeteer:
                 display_mode = 3
                 print("Display mode: Side-by-side")
         
+        warper.stop()
         cap.release()
         cv2.destroyAllWindows()
         print("\n✓ Face Puppeteer closed")
 
-if __name__ == "__main__":
+def main():
+    """Main entry point."""
+    import argparse
+    
+    parser = argparse.ArgumentParser(
+        description='Control a photo with your face movements'
+    )
+    parser.add_argument('--video', help='Driver video to render offline instead of using the camera')
+    parser.add_argument('--image', help='Target image to animate (required with --video)')
+    parser.add_argument('-o', '--output', default='puppeteer_output.mp4',
+                        help='Output MP4 path for --video (default: puppeteer_output.mp4)')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='Number of warp workers for --video (default: CPU count)')
+    args = parser.parse_args()
+    
+    if args.video and not args.image:
+        parser.error('--image is required with --video')
+    
     puppeteer = FacePuppeteer()
-    puppeteer.run()
+    if args.video:
+        if not puppeteer.export_video(args.video, args.image, args.output, args.workers):
+            sys.exit(1)
+    else:
+        puppeteer.run()
+
+
+if __name__ == "__main__":
+    main()
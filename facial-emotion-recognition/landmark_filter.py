@@ -0,0 +1,89 @@
+"""Temporal smoothing for MediaPipe face landmarks.
+
+Implements the One-Euro filter (Casiez et al.) vectorized over every
+landmark, so the whole face is filtered in a handful of NumPy operations.
+Slow movements are smoothed heavily to remove jitter while fast movements
+pass through with little lag.
+"""
+import math
+from collections import namedtuple
+
+import numpy as np
+
+
+Landmark = namedtuple("Landmark", ["x", "y", "z"])
+
+
+class LandmarkFilter:
+    """One-Euro filter for a full set of face landmarks."""
+
+    def __init__(self, min_cutoff=1.0, beta=10.0, d_cutoff=1.0):
+        """Create the filter.
+
+        Args:
+            min_cutoff: Cutoff frequency (Hz) when the face is still. Lower
+                means smoother but laggier.
+            beta: How quickly the cutoff rises with speed. Landmarks are in
+                normalized image units, so this is larger than the usual
+                pixel-space values.
+            d_cutoff: Cutoff frequency (Hz) for the speed estimate.
+        """
+        self.min_cutoff = min_cutoff
+        self.beta = beta
+        self.d_cutoff = d_cutoff
+        self.reset()
+
+    def reset(self):
+        """Forget the filter state, e.g. when the face is lost."""
+        self.value = None
+        self.speed = None
+        self.timestamp = None
+
+    @staticmethod
+    def _alpha(dt, cutoff):
+        tau = 1.0 / (2 * math.pi * cutoff)
+        return 1.0 / (1.0 + tau / dt)
+
+    def __call__(self, landmarks, timestamp):
+        """Filter one frame of landmarks.
+
+        Args:
+            landmarks: Sequence of objects with x, y and z attributes.
+            timestamp: Frame time in seconds.
+
+        Returns: list of Landmark tuples with the filtered coordinates
+        """
+        points = np.array([(lm.x, lm.y, lm.z) for lm in landmarks], dtype=np.float64)
+
+        if self.value is None or self.value.shape != points.shape or timestamp <= self.timestamp:
+            self.value = points
+            self.speed = np.zeros_like(points)
+            self.timestamp = timestamp
+            return self._to_landmarks(points)
+
+        dt = timestamp - self.timestamp
+        alpha_d = self._alpha(dt, self.d_cutoff)
+        self.speed = alpha_d * (points - self.value) / dt + (1.0 - alpha_d) * self.speed
+
+        cutoff = self.min_cutoff + self.beta * np.abs(self.speed)
+        tau = 1.0 / (2 * math.pi * cutoff)
+        alpha = 1.0 / (1.0 + tau / dt)
+        self.value = alpha * points + (1.0 - alpha) * self.value
+        self.timestamp = timestamp
+
+        return self._to_landmarks(self.value)
+
+    def predict(self, timestamp):
+        """Extrapolate the filtered landmarks to a later time.
+
+        Useful between inferences, or to compensate for processing latency.
+        Returns None if the filter has not seen any landmarks yet.
+        """
+        if self.value is None:
+            return None
+        dt = max(0.0, timestamp - self.timestamp)
+        return self._to_landmarks(self.value + self.speed * dt)
+
+    @staticmethod
+    def _to_landmarks(points):
+        return [Landmark(*row) for row in points.tolist()]
@@ -1,12 +1,25 @@
 #!/usr/bin/env python
 """
 PDF Joiner - Merge multiple PDF files into one
-Usage: python pdfjoiner.py input1.pdf input2.pdf ... -o output.pdf
+Usage: python pdfjoiner.py input1.pdf[:pages] input2.pdf ... -o output.pdf [--stream] [--split N] [--dedup]
+       python pdfjoiner.py --manifest jobs.json [-p processes]
 """
 import sys
 import os
+import re
+import csv
+import hashlib
+import json
+import threading
+import time
+import weakref
+import zlib
+from collections import OrderedDict, deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from io import BytesIO
 from pathlib import Path
 
+import argparse
 import importlib
 import subprocess
 
@@ -38,77 +51,664 @@ except ImportError:
         print("PyPDF2 not installed. Install with: pip install PyPDF2")
         sys.exit(1)
 
+from PyPDF2.generic import (ArrayObject, DecodedStreamObject, DictionaryObject, EncodedStreamObject,
+                            IndirectObject, NameObject, NullObject, NumberObject, StreamObject)
 
-def merge_pdfs(input_files, output_path=None):
+# Input files parsed ahead of the one being written in streaming mode
+READ_AHEAD = 4
+
+# Object numbers the streaming writer keeps for the page tree and catalog
+PAGES_OBJECT = 1
+CATALOG_OBJECT = 2
+
+# "file.pdf:pages" on the command line
+_INPUT_WITH_PAGES = re.compile(r'^(.+\.pdf):([\w,\s-]*)$', re.IGNORECASE)
+_PAGE_RANGE = re.compile(r'^(\d+|last)?(-)?(\d+|last)?$')
+
+# Object keys of each reader's pages, worked out once per reader
+_page_keys = weakref.WeakKeyDictionary()
+
+
+def parse_input(arg):
+    """Split "file.pdf:1-5,9" into ("file.pdf", "1-5,9"); without pages the spec is None."""
+    match = _INPUT_WITH_PAGES.match(arg)
+    if match and not os.path.exists(arg):
+        return match.group(1), match.group(2)
+    return arg, None
+
+
+def _page_number(value, num_pages):
+    number = num_pages if value == 'last' else int(value)
+    if not 1 <= number <= num_pages:
+        raise ValueError(f"page {value} is out of range (1-{num_pages})")
+    return number
+
+
+def select_pages(spec, num_pages):
+    """
+    Turn a page spec into 0-based page indices
+    
+    A spec is a comma-separated list of pages (9), ranges (1-5, 10- to the
+    end, 5-1 backwards), "odd", "even" and "last". Pages are numbered from 1
+    and may be listed more than once. No spec selects every page.
+    """
+    if not spec:
+        return list(range(num_pages))
+    pages = []
+    for part in spec.lower().replace(' ', '').split(','):
+        if part == 'odd':
+            pages.extend(range(0, num_pages, 2))
+            continue
+        if part == 'even':
+            pages.extend(range(1, num_pages, 2))
+            continue
+        match = _PAGE_RANGE.match(part)
+        if not part or not match:
+            raise ValueError(f"invalid page range '{part}'")
+        start, dash, end = match.groups()
+        start = _page_number(start, num_pages) if start else 1
+        end = _page_number(end, num_pages) if end else (num_pages if dash else start)
+        step = 1 if end >= start else -1
+        pages.extend(range(start - 1, end - 1 + step, step))
+    return pages
+
+
+def page_keys(reader):
+    """Return the (idnum, generation) of every page object in reader."""
+    keys = _page_keys.get(reader)
+    if keys is None:
+        keys = {(page.indirect_reference.idnum, page.indirect_reference.generation)
+                for page in reader.pages}
+        _page_keys[reader] = keys
+    return keys
+
+
+def chunk_name(output_file, number):
+    """Name of the nth file written by split mode: out.pdf -> out-001.pdf."""
+    path = Path(output_file)
+    return str(path.with_name(f"{path.stem}-{number:03d}{path.suffix or '.pdf'}"))
+
+
+def recompress_stream(stream):
+    """
+    Return stream Flate-compressed at the highest level, or stream itself
+    
+    Only uncompressed and plain Flate streams are touched; images in JPEG and
+    other formats are left as they are, as is anything that would not shrink.
+    """
+    if stream.get('/Type') == '/Metadata' or '/DecodeParms' in stream:
+        return stream
+    filters = stream.get('/Filter')
+    if isinstance(filters, ArrayObject) and len(filters) == 1:
+        filters = filters[0]
+    try:
+        if filters is None:
+            data = stream._data
+        elif filters == '/FlateDecode':
+            data = zlib.decompress(stream._data)
+        else:
+            return stream
+    except zlib.error:
+        return stream
+    compressed = zlib.compress(data, 9)
+    # An uncompressed stream also pays for the /Filter entry
+    if len(compressed) + (0 if filters else 21) >= len(stream._data):
+        return stream
+    result = EncodedStreamObject()
+    for key, value in stream.items():
+        if key not in ('/Filter', '/Length'):
+            result[NameObject(key)] = value
+    result[NameObject('/Filter')] = NameObject('/FlateDecode')
+    result._data = compressed
+    return result
+
+
+class StreamingPdfWriter:
+    """Write a merged PDF one object at a time.
+
+    Each page is copied with the objects it references and written to the
+    output straight away, so memory holds the file being copied rather than
+    the whole merged document. close() writes the page tree, catalog and
+    cross-reference table.
+
+    With dedup, every stream (fonts, images, ICC profiles, page contents) is
+    hashed before it is written, and references to a stream identical to one
+    already in the output point to that copy instead. With recompress,
+    streams go through recompress_stream().
+    """
+
+    def __init__(self, output, dedup=False, recompress=False):
+        self._output = output
+        self._offsets = [0, None, None]  # Byte offset of each object; 0 is the free entry
+        self._pages = ArrayObject()
+        self._streams = {} if dedup else None  # Stream hash -> object number
+        self.recompress = recompress
+        self.duplicates = 0
+        self.bytes_saved = 0
+        output.write(b'%PDF-1.7\n%\xe2\xe3\xcf\xd3\n')
+
+    def _reserve(self):
+        self._offsets.append(None)
+        return len(self._offsets) - 1
+
+    def _write_object(self, number, obj):
+        if self.recompress and isinstance(obj, StreamObject):
+            obj = recompress_stream(obj)
+        self._offsets[number] = self._output.tell()
+        self._output.write(b'%d 0 obj\n' % number)
+        obj.write_to_stream(self._output, None)
+        self._output.write(b'\nendobj\n')
+
+    def _add_stream(self, stream):
+        """Write a copied stream and return its number, or the number of an identical one."""
+        serialized = BytesIO()
+        stream.write_to_stream(serialized, None)
+        digest = hashlib.sha256(serialized.getbuffer()).digest()
+        number = self._streams.get(digest)
+        if number is not None:
+            self.duplicates += 1
+            self.bytes_saved += serialized.tell()
+            return number
+        number = self._streams[digest] = self._reserve()
+        self._write_object(number, stream)
+        return number
+
+    def _copy(self, obj, ref):
+        """Copy a direct object, mapping its references through ref()."""
+        if isinstance(obj, IndirectObject):
+            return ref(obj)
+        if isinstance(obj, DictionaryObject):
+            if isinstance(obj, StreamObject):
+                copy = EncodedStreamObject() if isinstance(obj, EncodedStreamObject) else DecodedStreamObject()
+                copy._data = obj._data
+            else:
+                copy = DictionaryObject()
+            is_page = obj.get('/Type') == '/Page'
+            for key, value in obj.items():
+                # A page's /Parent would drag in the source page tree
+                if not (is_page and key == '/Parent'):
+                    copy[NameObject(key)] = self._copy(value, ref)
+            if is_page:
+                copy[NameObject('/Parent')] = IndirectObject(PAGES_OBJECT, 0, None)
+            return copy
+        if isinstance(obj, ArrayObject):
+            return ArrayObject(self._copy(item, ref) for item in obj)
+        return obj
+
+    @property
+    def page_count(self):
+        return len(self._pages)
+
+    def add_pages(self, reader, pages=None):
+        """Copy pages of reader to the output; return the number of pages.
+
+        `pages` lists 0-based page indices, all pages by default. Only the
+        objects the chosen pages use are copied; links to pages that are
+        left out become null.
+        """
+        numbers = {}  # (idnum, generation) in reader -> object number in the output
+        pending = []  # (reference or page, object number) not written yet
+        page_objects = page_keys(reader)
+        hashing = set()  # Streams being copied for dedup, in case one refers back to itself
+
+        def ref(indirect):
+            key = (indirect.idnum, indirect.generation)
+            if key not in numbers:
+                if key in page_objects:
+                    return NullObject()  # A page that was not chosen
+                if self._streams is not None and key not in hashing:
+                    # Streams are written right away: their number depends on
+                    # whether an identical stream is already in the output
+                    obj = indirect.get_object()
+                    if isinstance(obj, StreamObject):
+                        hashing.add(key)
+                        numbers[key] = self._add_stream(self._copy(obj, ref))
+                        hashing.discard(key)
+                        return IndirectObject(numbers[key], 0, None)
+                numbers[key] = self._reserve()
+                pending.append((indirect, numbers[key]))
+            return IndirectObject(numbers[key], 0, None)
+
+        selected = reader.pages if pages is None else [reader.pages[i] for i in pages]
+        for page in selected:
+            # A page chosen twice gets a second page object; links go to the first
+            indirect = page.indirect_reference
+            number = self._reserve()
+            numbers.setdefault((indirect.idnum, indirect.generation), number)
+            # The page itself, not its reference: reading the reference again
+            # would lose the /MediaBox and /Resources it inherits from its parents
+            pending.append((page, number))
+            self._pages.append(IndirectObject(number, 0, None))
+        while pending:
+            indirect, number = pending.pop()
+            obj = indirect.get_object()
+            self._write_object(number, NullObject() if obj is None else self._copy(obj, ref))
+        return len(selected)
+
+    def close(self):
+        """Write the page tree, catalog and cross-reference table."""
+        self._write_object(PAGES_OBJECT, DictionaryObject({
+            NameObject('/Type'): NameObject('/Pages'),
+            NameObject('/Kids'): self._pages,
+            NameObject('/Count'): NumberObject(len(self._pages)),
+        }))
+        self._write_object(CATALOG_OBJECT, DictionaryObject({
+            NameObject('/Type'): NameObject('/Catalog'),
+            NameObject('/Pages'): IndirectObject(PAGES_OBJECT, 0, None),
+        }))
+
+        xref_offset = self._output.tell()
+        self._output.write(b'xref\n0 %d\n0000000000 65535 f \n' % len(self._offsets))
+        for offset in self._offsets[1:]:
+            self._output.write(b'%010d 00000 n \n' % offset)
+        self._output.write(b'trailer\n<< /Size %d /Root %d 0 R >>\nstartxref\n%d\n%%%%EOF\n'
+                           % (len(self._offsets), CATALOG_OBJECT, xref_offset))
+
+
+def open_pdf(input_file):
+    """Open and parse a PDF, leaving the file open for its objects to be read lazily."""
+    f = open(input_file, 'rb')
+    try:
+        reader = PdfReader(f)
+        if reader.is_encrypted and not reader.decrypt(''):
+            raise ValueError("password-protected")
+        len(reader.pages)  # Walk the page tree here, off the writing thread
+    except Exception as e:
+        f.close()
+        raise ValueError(f"{Path(input_file).name}: {e}") from e
+    return reader, f
+
+
+class ReaderCache:
+    """
+    Keep parsed readers open so inputs used again are not parsed again
+    
+    Holds the `size` most recently used files; a file is parsed again if it
+    changed on disk. Objects read from a file are still dropped after each
+    use, so a cached reader costs little more than its page list.
+    """
+    
+    def __init__(self, size=32):
+        self.size = size
+        self._readers = OrderedDict()  # (path, mtime, size) -> (reader, file)
+        self._lock = threading.Lock()
+    
+    def open(self, input_file):
+        """Return (reader, None); the cache closes the file."""
+        stat = os.stat(input_file)
+        key = (os.path.abspath(input_file), stat.st_mtime_ns, stat.st_size)
+        with self._lock:
+            if key in self._readers:
+                self._readers.move_to_end(key)
+            else:
+                self._readers[key] = open_pdf(input_file)
+                while len(self._readers) > self.size:
+                    self._readers.popitem(last=False)[1][1].close()
+            return self._readers[key][0], None
+    
+    def close(self):
+        with self._lock:
+            for _, f in self._readers.values():
+                f.close()
+            self._readers.clear()
+
+
+def _use_reader(input_file, future):
+    reader, f = future.result()
+    try:
+        yield input_file, reader
+    finally:
+        if f:
+            f.close()
+        # Readers and their pages refer to each other, so without this the
+        # objects read from the file would wait for the garbage collector
+        reader.resolved_objects.clear()
+
+
+def iter_readers(input_files, workers=READ_AHEAD, cache=None):
+    """
+    Yield (input file, reader) in order, parsing up to `workers` files ahead
+    
+    Readers come from `cache` (a ReaderCache) when one is given; it must
+    hold more than `workers` files.
+    """
+    open_reader = cache.open if cache else open_pdf
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        pending = deque()
+        remaining = iter(input_files)
+        try:
+            for input_file in remaining:
+                pending.append((input_file, pool.submit(open_reader, input_file)))
+                if len(pending) < workers:
+                    continue
+                input_file, future = pending.popleft()
+                yield from _use_reader(input_file, future)
+            while pending:
+                input_file, future = pending.popleft()
+                yield from _use_reader(input_file, future)
+        finally:
+            # Close files parsed ahead of an error
+            for _, future in pending:
+                if not future.cancel() and not future.exception() and future.result()[1]:
+                    future.result()[1].close()
+
+
+def pages_to_copy(input_file, spec, reader):
+    try:
+        return select_pages(spec, len(reader.pages))
+    except ValueError as e:
+        raise ValueError(f"{Path(input_file).name}: {e}") from e
+
+
+def input_label(input_file, spec):
+    return f"{Path(input_file).name}:{spec}" if spec else Path(input_file).name
+
+
+def check_inputs(inputs):
+    """Raise ValueError listing every missing or non-PDF file in inputs."""
+    if not inputs:
+        raise ValueError("No input files provided")
+    problems = []
+    for input_file, _ in inputs:
+        if not os.path.exists(input_file):
+            problems.append(f"File not found: {input_file}")
+        elif not input_file.lower().endswith('.pdf'):
+            problems.append(f"Not a PDF file: {input_file}")
+    if problems:
+        raise ValueError('\n'.join(problems))
+
+
+def stream_merge(inputs, output_file, workers=READ_AHEAD, split=None, dedup=False, recompress=False,
+                 cache=None, verbose=True):
+    """
+    Merge with StreamingPdfWriter
+    
+    Args:
+        inputs: List of (file path, page spec or None)
+        output_file: Output file path, or the name pattern in split mode
+        workers: Files parsed ahead of the one being copied
+        split: Start a new output file every `split` pages
+        dedup: Store identical streams once per output file
+        recompress: Recompress streams with Flate at the highest level
+        cache: ReaderCache to take parsed readers from
+        verbose: Print a line per input file
+    
+    Returns:
+        (pages written, list of output files); on an error, files already
+        written are removed
+    """
+    total_pages = 0
+    output_files = []
+    output = writer = None
+    duplicates = bytes_saved = 0
+    readers = iter_readers([input_file for input_file, _ in inputs], workers, cache)
+    try:
+        for i, ((input_file, spec), (_, reader)) in enumerate(zip(inputs, readers), 1):
+            if verbose:
+                print(f"  {i}. Adding {input_label(input_file, spec)}...", end=" ")
+            pages = pages_to_copy(input_file, spec, reader)
+            num_pages = len(pages)
+            while pages or writer is None:
+                if writer is None or (split and writer.page_count >= split):
+                    if writer:
+                        writer.close()
+                        output.close()
+                        duplicates += writer.duplicates
+                        bytes_saved += writer.bytes_saved
+                    output_files.append(chunk_name(output_file, len(output_files) + 1) if split else output_file)
+                    output = open(output_files[-1], 'wb')
+                    writer = StreamingPdfWriter(output, dedup, recompress)
+                count = split - writer.page_count if split else len(pages)
+                writer.add_pages(reader, pages[:count])
+                pages = pages[count:]
+            total_pages += num_pages
+            if verbose:
+                print(f"({num_pages} pages)")
+        if writer:
+            writer.close()
+            duplicates += writer.duplicates
+            bytes_saved += writer.bytes_saved
+    except BaseException:
+        if output:
+            output.close()
+        for path in output_files:
+            if os.path.exists(path):
+                os.remove(path)
+        raise
+    finally:
+        readers.close()
+        if output:
+            output.close()
+    if dedup and verbose:
+        print(f"\n  Shared {duplicates} duplicate streams ({bytes_saved / 1e6:.1f} MB saved)")
+    return total_pages, output_files
+
+
+def merge_pdfs(input_files, output_path=None, streaming=False, workers=READ_AHEAD, split=None,
+               dedup=False, recompress=False):
     """
     Merge multiple PDF files into one
     
     Args:
-        input_files: List of input PDF file paths
+        input_files: List of input PDF file paths, each optionally followed
+            by a page spec ("report.pdf:1-5,9"; see select_pages)
         output_path: Output file path (default: merged_output.pdf)
+        streaming: Write pages as they are copied instead of building the
+            whole document in memory first
+        workers: Files parsed ahead of the one being copied (streaming only)
+        split: Write the result as files of this many pages, named after
+            output_path (out-001.pdf, out-002.pdf, ...); implies streaming
+        dedup: Store fonts, images and other streams that several inputs
+            share only once; implies streaming
+        recompress: Recompress uncompressed and Flate streams at the highest
+            level; implies streaming
     """
-    if not input_files:
-        print("No input files provided")
-        sys.exit(1)
+    inputs = [parse_input(input_file) for input_file in input_files]
     
-    # Validate input files
-    for input_file in input_files:
-        if not os.path.exists(input_file):
-                print(f"File not found: {input_file}")
-            sys.exit(1)
-        if not input_file.lower().endswith('.pdf'):
-                print(f"Not a PDF file: {input_file}")
-            sys.exit(1)
+    try:
+        check_inputs(inputs)
+    except ValueError as e:
+        print(e)
+        sys.exit(1)
     
-            print(f"\nMerging {len(input_files)} PDF files...\n")
+    print(f"\nMerging {len(inputs)} PDF files...\n")
     
-    writer = PdfWriter()
-    total_pages = 0
+    output_file = output_path or 'merged_output.pdf'
     
     try:
-        for i, input_file in enumerate(input_files, 1):
-            print(f"  {i}. Adding {Path(input_file).name}...", end=" ")
+        if streaming or split or dedup or recompress:
+            total_pages, output_files = stream_merge(inputs, output_file, workers, split, dedup, recompress)
+        else:
+            writer = PdfWriter()
+            total_pages = 0
+            output_files = [output_file]
+            # PyPDF2 remembers copied objects by id(reader); keep every reader
+            # alive so a later one cannot reuse an id and get the wrong pages
+            readers = []
             
-            with open(input_file, 'rb') as f:
-                reader = PdfReader(f)
-                num_pages = len(reader.pages)
-                
-                for page_num in range(num_pages):
-                    writer.add_page(reader.pages[page_num])
+            for i, (input_file, spec) in enumerate(inputs, 1):
+                print(f"  {i}. Adding {input_label(input_file, spec)}...", end=" ")
                 
-                total_pages += num_pages
-                print(f"({num_pages} pages)")
-        
-        # Write output
-        output_file = output_path or 'merged_output.pdf'
-        with open(output_file, 'wb') as output:
-            writer.write(output)
+                with open(input_file, 'rb') as f:
+                    reader = PdfReader(f)
+                    readers.append(reader)
+                    pages = pages_to_copy(input_file, spec, reader)
+                    
+                    for page_num in pages:
+                        writer.add_page(reader.pages[page_num])
+                    
+                    total_pages += len(pages)
+                    print(f"({len(pages)} pages)")
+            
+            # Write output
+            with open(output_file, 'wb') as output:
+                writer.write(output)
         
-        print(f"\nSuccess! Merged {total_pages} pages into: {output_file}\n")
+        if split:
+            print(f"\nSuccess! Split {total_pages} pages into {len(output_files)} files: "
+                  f"{output_files[0]} ... {output_files[-1]}\n")
+        else:
+            print(f"\nSuccess! Merged {total_pages} pages into: {output_file}\n")
         
     except Exception as e:
         print(f"\nError merging PDFs: {e}")
         sys.exit(1)
 
 
-if __name__ == '__main__':
-    if len(sys.argv) < 2:
-        print("PDF Joiner - Merge multiple PDF files\n")
-        print("Usage: python pdfjoiner.py input1.pdf input2.pdf ... [-o output.pdf]")
-        print("\nExample: python pdfjoiner.py file1.pdf file2.pdf file3.pdf -o merged.pdf")
-        sys.exit(1)
+def load_manifest(manifest_path):
+    """
+    Read merge jobs from a JSON or CSV manifest
     
-    # Parse arguments
-    args = sys.argv[1:]
-    output_file = None
+    JSON: a list of jobs, or {"jobs": [...]}, each like
+    {"output": "packet.pdf", "inputs": ["cover.pdf", "report.pdf:1-5"]}
+    with optional "split", "dedup" and "recompress".
     
-    if '-o' in args:
-        o_index = args.index('-o')
-        if o_index + 1 < len(args):
-            output_file = args[o_index + 1]
-            args = args[:o_index] + args[o_index + 2:]
-        else:
-            print("No output file specified after -o")
+    CSV: columns output, input and optionally pages; rows with the same
+    output form one job, in the order they appear.
+    
+    Relative paths are taken from the manifest's folder.
+    """
+    base = os.path.dirname(os.path.abspath(manifest_path))
+    if manifest_path.lower().endswith('.csv'):
+        jobs = {}
+        with open(manifest_path, newline='', encoding='utf-8') as f:
+            rows = csv.DictReader(f)
+            for row in rows:
+                output = (row.get('output') or '').strip()
+                input_file = (row.get('input') or '').strip()
+                pages = (row.get('pages') or '').strip()
+                if not output or not input_file:
+                    raise ValueError(f"{manifest_path} line {rows.line_num}: output and input are required")
+                job = jobs.setdefault(output, {'output': output, 'inputs': []})
+                job['inputs'].append(f"{input_file}:{pages}" if pages else input_file)
+        jobs = list(jobs.values())
+    else:
+        with open(manifest_path, encoding='utf-8') as f:
+            data = json.load(f)
+        jobs = data.get('jobs') if isinstance(data, dict) else data
+        if not isinstance(jobs, list):
+            raise ValueError(f"{manifest_path}: expected a list of jobs")
+        for number, job in enumerate(jobs, 1):
+            if not isinstance(job, dict) or not job.get('output') or not isinstance(job.get('inputs'), list):
+                raise ValueError(f"{manifest_path}: job {number} needs an output and a list of inputs")
+    
+    for job in jobs:
+        job['output'] = os.path.normpath(os.path.join(base, job['output']))
+        job['inputs'] = [os.path.normpath(os.path.join(base, input_file)) for input_file in job['inputs']]
+    return jobs
+
+
+# Readers kept by each batch worker process
+_worker_cache = None
+
+
+def _init_batch_worker(cache_size):
+    global _worker_cache
+    _worker_cache = ReaderCache(cache_size)
+
+
+def run_job(job, options):
+    """Run one manifest job in a worker; return a result dict instead of raising."""
+    started = time.monotonic()
+    result = {'output': job['output'], 'pages': 0, 'files': [], 'error': None}
+    try:
+        inputs = [parse_input(input_file) for input_file in job['inputs']]
+        check_inputs(inputs)
+        os.makedirs(os.path.dirname(os.path.abspath(job['output'])), exist_ok=True)
+        result['pages'], result['files'] = stream_merge(
+            inputs, job['output'], options['workers'],
+            split=job.get('split', options['split']),
+            dedup=job.get('dedup', options['dedup']),
+            recompress=job.get('recompress', options['recompress']),
+            cache=_worker_cache, verbose=False)
+    except Exception as e:
+        result['error'] = str(e).replace('\n', '; ') or type(e).__name__
+    result['seconds'] = round(time.monotonic() - started, 2)
+    return result
+
+
+def run_batch(manifest_path, processes=None, workers=READ_AHEAD, split=None, dedup=False, recompress=False):
+    """
+    Run every job in a manifest on a pool of processes
+    
+    A failed job is reported and the rest carry on. Each process keeps the
+    files it has parsed, so inputs shared between jobs (a cover page, terms
+    and conditions) are parsed once per process. Command-line options are
+    defaults that a JSON job can override.
+    
+    Returns:
+        List of job results, in manifest order
+    """
+    jobs = load_manifest(manifest_path)
+    processes = processes or os.cpu_count() or 1
+    options = {'workers': workers, 'split': split, 'dedup': dedup, 'recompress': recompress}
+    print(f"\nRunning {len(jobs)} merge jobs on {processes} processes...\n")
+    
+    results = [None] * len(jobs)
+    started = time.monotonic()
+    with ProcessPoolExecutor(max_workers=processes, initializer=_init_batch_worker,
+                             initargs=(max(32, workers + 1),)) as pool:
+        futures = {pool.submit(run_job, job, options): i for i, job in enumerate(jobs)}
+        for done, future in enumerate(as_completed(futures), 1):
+            result = results[futures[future]] = future.result()
+            if result['error']:
+                print(f"  [{done}/{len(jobs)}] FAILED {result['output']}: {result['error']}")
+            else:
+                print(f"  [{done}/{len(jobs)}] {result['output']} ({result['pages']} pages, {result['seconds']}s)")
+    
+    failed = [r for r in results if r['error']]
+    print(f"\nFinished {len(jobs) - len(failed)} of {len(jobs)} jobs in {time.monotonic() - started:.1f}s")
+    if failed:
+        print(f"{len(failed)} failed:")
+        for result in failed:
+            print(f"  {result['output']}: {result['error']}")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='PDF Joiner - Merge multiple PDF files',
+        epilog='Examples: python pdfjoiner.py file1.pdf file2.pdf file3.pdf -o merged.pdf\n'
+               '          python pdfjoiner.py a.pdf:1-5,9 b.pdf:odd c.pdf:last -o picked.pdf\n'
+               '          python pdfjoiner.py book.pdf --split 20 -o chapter.pdf\n'
+               '          python pdfjoiner.py --manifest packets.csv -p 8',
+        formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('input_files', nargs='*', metavar='input.pdf[:pages]',
+                        help='PDF files to merge, in order; pages as in 1-5,9 / 10- / 5-1 / odd / even / last')
+    parser.add_argument('-o', '--output', help='Output file (default: merged_output.pdf)')
+    parser.add_argument('--stream', action='store_true',
+                        help='Write pages as they are copied; keeps memory low for large or many inputs')
+    parser.add_argument('-j', '--workers', type=int, default=READ_AHEAD,
+                        help=f'Files parsed in parallel ahead of the one being written with --stream (default: {READ_AHEAD})')
+    parser.add_argument('--split', type=int, metavar='N',
+                        help='Write the result as files of N pages: output-001.pdf, output-002.pdf, ...')
+    parser.add_argument('--dedup', action='store_true',
+                        help='Store fonts, images and other data shared between inputs only once')
+    parser.add_argument('--recompress', action='store_true',
+                        help='Recompress uncompressed and Flate-compressed data at the highest level')
+    parser.add_argument('--manifest', help='Run the merge jobs listed in a JSON or CSV file instead')
+    parser.add_argument('-p', '--processes', type=int,
+                        help='Processes for --manifest jobs (default: one per CPU)')
+    args = parser.parse_args()
+    if args.split is not None and args.split < 1:
+        parser.error('--split needs a page count of at least 1')
+    
+    if args.manifest:
+        if args.input_files or args.output:
+            parser.error('--manifest takes its inputs and outputs from the manifest')
+        try:
+            results = run_batch(args.manifest, args.processes, max(1, args.workers), args.split,
+                                args.dedup, args.recompress)
+        except (OSError, ValueError) as e:
+            print(f"Cannot read manifest: {e}")
             sys.exit(1)
+        sys.exit(1 if any(r['error'] for r in results) else 0)
+    if not args.input_files:
+        parser.error('give the PDF files to merge, or --manifest')
     
-    merge_pdfs(args, output_file)
\ No newline at end of file
+    merge_pdfs(args.input_files, args.output, streaming=args.stream, workers=max(1, args.workers),
+               split=args.split, dedup=args.dedup, recompress=args.recompress)
+
+
+if __name__ == '__main__':
+    main()
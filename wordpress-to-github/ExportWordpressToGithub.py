@@ -1,20 +1,36 @@
 # WordPress to GitHub Export
+import codecs
+import email.utils
+import hashlib
 import importlib
+import itertools
+import json
 import os
+import posixpath
 import re
 import subprocess
 import sys
-from datetime import datetime, timedelta
+import threading
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import ExitStack, nullcontext
+from functools import lru_cache
+from datetime import datetime, timedelta, timezone
 from urllib.parse import urlparse
-from bs4 import BeautifulSoup
 from requests.adapters import HTTPAdapter
 from urllib3.util.retry import Retry
 import requests
 
+try:
+    import ijson  # Optional: faster incremental JSON parsing
+except ImportError:
+    ijson = None
+
 
 def ensure_dependencies():
     missing = []
-    for pkg, module in [("requests", "requests"), ("beautifulsoup4", "bs4"), ("urllib3", "urllib3")]:
+    for pkg, module in [("requests", "requests"), ("urllib3", "urllib3")]:
         try:
             importlib.import_module(module)
         except ImportError:
@@ -30,81 +46,847 @@ def ensure_dependencies():
 
 ensure_dependencies()
 
+from export_output import DirectoryOutput, GitOutput
+from markdown_converter import html_to_markdown, html_to_text
+from wp_search import INDEX_NAME, SearchIndex, index_exported_posts
+
 # Simple tool to export WordPress posts into categorized Markdown files for GitHub.
 
+# Number of post pages fetched ahead concurrently
+PAGE_WORKERS = 4
+# Concurrent image downloads in total, and per image host. Most sites serve
+# their own images, so one host may use every worker; the session's
+# HostLimiter backs off from a host that struggles.
+IMAGE_WORKERS = 8
+IMAGE_WORKERS_PER_HOST = IMAGE_WORKERS
+# Posts whose images download while an earlier post waits to be written
+POSTS_AHEAD = 2 * IMAGE_WORKERS
+# Processes converting post HTML to Markdown; with 1 it runs in the export thread
+CONVERT_WORKERS = os.cpu_count() or 1
+# Posts handed to the conversion processes ahead of the one being written
+CONVERT_AHEAD = 32
+# Only the post fields the exporter uses; _links/_embedded keep term embedding working
+POST_FIELDS = 'id,date,modified_gmt,title,content,_links,_embedded'
+# How often a request answered with 429 or 503 is retried
+RATE_LIMIT_RETRIES = 5
+RATE_LIMIT_STATUSES = (429, 503)
+# How often a page whose download breaks off is requested again
+PAGE_RETRIES = 2
+# Longest Retry-After pause honoured, in seconds
+MAX_RETRY_AFTER = 300
+
+
+def parse_retry_after(value):
+    """Return the delay in seconds from a Retry-After header, or None."""
+    if not value:
+        return None
+    try:
+        delay = float(value)
+    except ValueError:
+        try:
+            when = email.utils.parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return None
+        if when.tzinfo is None:
+            when = when.replace(tzinfo=timezone.utc)
+        delay = (when - datetime.now(timezone.utc)).total_seconds()
+    return min(max(0.0, delay), MAX_RETRY_AFTER)
+
+class HostLimiter:
+    """Adaptive request limiter for one host.
+
+    At most `limit` requests run at once, and a token bucket paces them at
+    `rate` per second. The limit doubles per round trip until the host first
+    pushes back, while the rate starts at max_rate; both are halved when the
+    host answers 429/503, fails, or its latency climbs well above the best
+    seen, and grow additively after that (AIMD, as in TCP congestion
+    control). Retry-After pauses the whole host.
+
+    Latency is tracked per request kind (see request_kind), so slow API pages
+    mixed with fast images are not mistaken for congestion.
+    """
+
+    def __init__(self, limit=4.0, max_rate=200.0, max_limit=32.0,
+                 min_rate=0.5, latency_slack=0.25):
+        self.rate = max_rate
+        self.limit = limit
+        self.max_rate = max_rate
+        self.max_limit = max_limit
+        self.min_rate = min_rate
+        self.latency_slack = latency_slack
+        self.in_flight = 0
+        self._tokens = 1.0
+        self._last = time.monotonic()
+        self._paused_until = 0.0
+        self._slow_start = True
+        self._best_latency = {}
+        self._latency = {}
+        self._last_decrease = 0.0
+        self._cond = threading.Condition()
+
+    def acquire(self):
+        """Wait for a request slot and a token."""
+        with self._cond:
+            while True:
+                now = time.monotonic()
+                # Allow bursts of up to one second of requests
+                self._tokens = min(max(1.0, self.rate), self._tokens + (now - self._last) * self.rate)
+                self._last = now
+                if now < self._paused_until:
+                    wait = self._paused_until - now
+                elif self.in_flight >= int(self.limit):
+                    wait = None  # Woken by release()
+                elif self._tokens < 1:
+                    wait = (1 - self._tokens) / self.rate
+                else:
+                    self._tokens -= 1
+                    self.in_flight += 1
+                    return
+                self._cond.wait(wait)
+
+    def release(self):
+        """Give back the request slot taken by acquire()."""
+        with self._cond:
+            self.in_flight -= 1
+            self._cond.notify_all()
+
+    def record(self, latency=None, status=None, retry_after=None, kind=None):
+        """Adapt the limits to how a request of the given kind went.
+
+        `latency` is None when the request failed without a response.
+        """
+        with self._cond:
+            now = time.monotonic()
+            if retry_after is not None:
+                self._paused_until = max(self._paused_until, now + retry_after)
+
+            congested = latency is None or status in RATE_LIMIT_STATUSES
+            if latency is not None:
+                average = self._latency.get(kind)
+                self._latency[kind] = latency if average is None else 0.8 * average + 0.2 * latency
+                self._best_latency[kind] = min(latency, self._best_latency.get(kind, latency))
+                congested = congested or self._latency[kind] > 2 * self._best_latency[kind] + self.latency_slack
+
+            if congested:
+                # Responses already in flight carry the same signal; back off once per round trip
+                if now - self._last_decrease > max(self._latency.get(kind) or 0, 0.1):
+                    self._slow_start = False
+                    self._last_decrease = now
+                    self.rate = max(self.min_rate, self.rate / 2)
+                    self.limit = max(1.0, self.limit / 2)
+                    self._tokens = min(self._tokens, 0.0)
+            elif self._slow_start:
+                self.limit = min(self.max_limit, self.limit + 1)
+            else:
+                self.rate = min(self.max_rate, self.rate + 1 / self.rate)
+                self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+            self._cond.notify_all()
+
+def request_kind(url):
+    """Group requests whose latencies are comparable: REST API calls or files."""
+    return 'api' if '/wp-json/' in urlparse(url).path else 'file'
+
+class TransferBudget:
+    """Limits shared by every site of a multi-site export.
+
+    `max_requests` caps the HTTP requests in flight across all sessions and
+    `max_bytes_per_second` caps the combined download rate. Either may be
+    None for no limit. Each host also gets one adaptive HostLimiter, shared
+    by every session that talks to it.
+    """
+
+    def __init__(self, max_requests=None, max_bytes_per_second=None):
+        self.max_bytes_per_second = max_bytes_per_second
+        self._requests = threading.BoundedSemaphore(max_requests) if max_requests else None
+        self._tokens = max_bytes_per_second or 0
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+        self._hosts = {}
+
+    def request_slot(self):
+        return self._requests or nullcontext()
+
+    def host_limiter(self, host):
+        with self._lock:
+            if host not in self._hosts:
+                self._hosts[host] = HostLimiter()
+            return self._hosts[host]
+
+    def consume(self, nbytes):
+        """Account for downloaded bytes, sleeping while over the rate limit."""
+        if not self.max_bytes_per_second:
+            return
+        with self._lock:
+            now = time.monotonic()
+            # Token bucket holding up to one second of transfer
+            self._tokens = min(self.max_bytes_per_second,
+                               self._tokens + (now - self._last) * self.max_bytes_per_second)
+            self._last = now
+            self._tokens -= nbytes
+            wait = -self._tokens / self.max_bytes_per_second if self._tokens < 0 else 0
+        if wait:
+            time.sleep(wait)
+
+class ExportSession(requests.Session):
+    """Session that rate limits each host and counts downloaded bytes.
+
+    Requests go through the host's HostLimiter and the TransferBudget. A
+    streamed response keeps its slot in both until it is closed, so the
+    limits count bodies still downloading; calling release_slot() on the
+    response gives the slot back early. Responses with 429 Too Many Requests or 503 Service Unavailable are
+    retried after the server's Retry-After delay (or an exponential
+    backoff), pausing every request to that host meanwhile.
+    """
+
+    def __init__(self, budget=None):
+        super().__init__()
+        self.budget = budget or TransferBudget()
+        self.bytes = 0
+        self._bytes_lock = threading.Lock()
+
+    def request(self, method, url, *args, **kwargs):
+        host = urlparse(url).netloc
+        limiter = self.budget.host_limiter(host)
+        kind = request_kind(url)
+        for attempt in range(RATE_LIMIT_RETRIES + 1):
+            limiter.acquire()
+            slot = ExitStack()
+            slot.callback(limiter.release)
+            started = time.monotonic()
+            try:
+                slot.enter_context(self.budget.request_slot())
+                response = super().request(method, url, *args, **kwargs)
+            except Exception:
+                limiter.record(kind=kind)
+                slot.close()
+                raise
 
-def create_session(verify_ssl=True):
-    session = requests.Session()
-    retry = Retry(total=3, backoff_factor=0.5, status_forcelist=[429, 500, 502, 503, 504])
-    adapter = HTTPAdapter(max_retries=retry)
+            retry_after = parse_retry_after(response.headers.get('Retry-After'))
+            if response.status_code in RATE_LIMIT_STATUSES and retry_after is None:
+                retry_after = 0.5 * 2 ** attempt
+            limiter.record(time.monotonic() - started, response.status_code, retry_after, kind)
+
+            if response.status_code not in RATE_LIMIT_STATUSES or attempt == RATE_LIMIT_RETRIES:
+                if not kwargs.get('stream'):
+                    slot.close()
+                else:
+                    self._release_on_close(response, slot.close)
+                return response
+            slot.close()
+            print(f"Rate limited by {host}; retrying in {retry_after:.1f}s")
+            response.close()
+
+    @staticmethod
+    def _release_on_close(response, release):
+        close = response.close
+
+        def close_and_release():
+            try:
+                close()
+            finally:
+                release()
+
+        response.close = close_and_release
+        response.release_slot = release
+
+    def count_bytes(self, nbytes):
+        with self._bytes_lock:
+            self.bytes += nbytes
+        self.budget.consume(nbytes)
+
+class SiteSession:
+    """Per-site view of a shared ExportSession that keeps its own byte count.
+
+    Sites on the same host share one session and its connection pool, while
+    each site's summary still reports only its own traffic.
+    """
+
+    def __init__(self, session):
+        self.session = session
+        self.bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, *args, **kwargs):
+        return self.session.get(*args, **kwargs)
+
+    def count_bytes(self, nbytes):
+        with self._lock:
+            self.bytes += nbytes
+        self.session.count_bytes(nbytes)
+
+def create_session(verify_ssl=True, pool_size=10, budget=None):
+    session = ExportSession(budget)
+    # 429, 503 and Retry-After are handled by ExportSession, which slows the whole host down
+    retry = Retry(total=3, backoff_factor=0.5, status_forcelist=[500, 502, 504],
+                  respect_retry_after_header=False)
+    adapter = HTTPAdapter(max_retries=retry, pool_connections=pool_size, pool_maxsize=pool_size)
     session.mount("http://", adapter)
     session.mount("https://", adapter)
     session.verify = verify_ssl
     return session
 
+_UNSAFE_FILENAME_CHARS = re.compile(r'[^\w\s-]')
+_UNSAFE_EXTENSION_CHARS = re.compile(r'[^\w.]')
+# Slugs that clash with the category README.md or are device names on Windows
+RESERVED_SLUGS = frozenset(['readme', 'con', 'prn', 'aux', 'nul'] +
+                           [f'{name}{i}' for name in ('com', 'lpt') for i in range(1, 10)])
+
+@lru_cache(maxsize=4096)
 def sanitize_filename(title):
-    return re.sub(r'[^\w\s-]', '', title).strip().lower().replace(' ', '-')
+    return _UNSAFE_FILENAME_CHARS.sub('', title).strip().lower().replace(' ', '-')
+
+def category_folder(category):
+    """Folder name for a category."""
+    slug = sanitize_filename(category)
+    if not slug:
+        return 'uncategorized'
+    return f'{slug}-category' if slug in RESERVED_SLUGS else slug
+
+def post_path(category, title, post_id, owner_of):
+    """Path of a post's file, relative to the site folder.
 
-def download_image(session, image_url, category_dir, post_title, site_url, image_counter):
+    Normally category/slug.md. If the slug is empty or reserved, or
+    owner_of(path) says another post already has that path, the post id is
+    appended (slug-123.md), so different posts never overwrite each other
+    and each keeps the same name on every run.
+    """
+    slug = sanitize_filename(title)
+    relpath = f"{category}/{slug}.md"
+    if slug and slug not in RESERVED_SLUGS and owner_of(relpath) in (None, str(post_id)):
+        return relpath
+    return f"{category}/{slug or 'post'}-{post_id}.md"
+
+def resolve_image_url(image_url, site_url):
+    # Handle relative URLs
+    if image_url.startswith('//'):
+        return 'https:' + image_url
+    elif image_url.startswith('/'):
+        return site_url + image_url
+    elif not image_url.startswith(('http://', 'https://')):
+        return site_url + '/' + image_url
+    return image_url
+
+class ImageStore:
+    """Content-addressed store for downloaded images.
+
+    Every image is stored once as <sha256><ext> under `root`, and index.json
+    maps source URLs to stored files so a URL is only downloaded once, even
+    across runs. Category directories get hard links to the stored files.
+    The index is saved with every checkpoint of the export state.
+    """
+
+    def __init__(self, root):
+        self.root = root
+        self.index_path = os.path.join(root, 'index.json')
+        os.makedirs(root, exist_ok=True)
+        # Downloads cut short by a crash
+        for name in os.listdir(root):
+            if name.endswith('.part'):
+                os.remove(os.path.join(root, name))
+        self._lock = threading.Lock()
+        self._urls = {}
+        if os.path.exists(self.index_path):
+            with open(self.index_path, 'r', encoding='utf-8') as f:
+                self._urls = json.load(f)
+
+    def lookup(self, image_url):
+        """Return the stored filename for a URL, or None if not downloaded yet."""
+        with self._lock:
+            stored_name = self._urls.get(image_url)
+        if stored_name and os.path.exists(os.path.join(self.root, stored_name)):
+            return stored_name
+        return None
+
+    def add(self, image_url, partial_path, digest, extension):
+        """Move a finished download into the store and return its filename."""
+        stored_name = f"{digest}{extension}"
+        stored_path = os.path.join(self.root, stored_name)
+        with self._lock:
+            if os.path.exists(stored_path):
+                os.remove(partial_path)  # Same content already stored from another URL
+            else:
+                os.replace(partial_path, stored_path)
+            self._urls[image_url] = stored_name
+        return stored_name
+
+    def path(self, stored_name):
+        return os.path.join(self.root, stored_name)
+
+    def save(self):
+        with self._lock:
+            partial_path = self.index_path + '.part'
+            with open(partial_path, 'w', encoding='utf-8') as f:
+                json.dump(self._urls, f, indent=2)
+            os.replace(partial_path, self.index_path)
+
+def download_image(session, store, image_url):
+    """Download an image into the store and return its stored filename.
+
+    Returns (stored_name, downloaded); downloaded is False when the URL was
+    already in the store.
+    """
     try:
-        # Handle relative URLs
-        if image_url.startswith('//'):
-            image_url = 'https:' + image_url
-        elif image_url.startswith('/'):
-            image_url = site_url + image_url
-        elif not image_url.startswith(('http://', 'https://')):
-            image_url = site_url + '/' + image_url
-
-        # Create images directory inside category
-        images_dir = os.path.join(category_dir, 'images')
-        if not os.path.exists(images_dir):
-            os.makedirs(images_dir)
-        
-        # Get image filename from URL
-        image_name = os.path.basename(urlparse(image_url).path)
-        # Sanitize image name
-        image_name = re.sub(r'[^\w\-._]', '', image_name)
-        # Save image with post title prefix to avoid conflicts
-        image_name = f"{sanitize_filename(post_title)}-{image_name}"
-        
-        image_path = os.path.join(images_dir, image_name)
-        
-        # Download image
-        response = session.get(image_url, timeout=20)
-        if response.status_code == 200:
-            with open(image_path, 'wb') as f:
-                f.write(response.content)
-            image_counter[0] += 1  # Increment image counter
-            # Return relative path for markdown
-            return f'images/{image_name}'
+        stored_name = store.lookup(image_url)
+        if stored_name:
+            return stored_name, False
+
+        # Keep the original extension so viewers recognise the file type
+        extension = os.path.splitext(urlparse(image_url).path)[1].lower()
+        extension = _UNSAFE_EXTENSION_CHARS.sub('', extension)[:10]
+
+        # Stream to disk while hashing, instead of buffering the whole body
+        with session.get(image_url, timeout=20, stream=True) as response:
+            if response.status_code == 200:
+                digest = hashlib.sha256()
+                partial_path = os.path.join(store.root, f"{threading.get_ident()}-{id(response)}.part")
+                try:
+                    with open(partial_path, 'wb') as f:
+                        for chunk in response.iter_content(chunk_size=64 * 1024):
+                            digest.update(chunk)
+                            f.write(chunk)
+                            session.count_bytes(len(chunk))
+                except Exception:
+                    if os.path.exists(partial_path):
+                        os.remove(partial_path)
+                    raise
+                return store.add(image_url, partial_path, digest.hexdigest(), extension), True
     except Exception as e:
         print(f"Error downloading image {image_url}: {e}")
-    return None
+    return None, False
 
-def process_content(session, content, category_dir, post_title, site_url, image_counter):
-    soup = BeautifulSoup(content, 'html.parser')
-    
-    # Find all images
-    for img in soup.find_all('img'):
-        src = img.get('src')
-        if src:
-            # Download image and get new path
-            new_path = download_image(session, src, category_dir, post_title, site_url, image_counter)
-            if new_path:
-                # Update image source in content
-                content = content.replace(src, new_path)
+class ImageDownloader:
+    """Download images on a shared thread pool.
+
+    At most `workers` downloads run at once, and at most `per_host` of them
+    against the same host; set per_host lower to keep one slow CDN from
+    taking every worker. Each URL is fetched at most once per run.
+    """
+
+    def __init__(self, session, store, workers=IMAGE_WORKERS, per_host=IMAGE_WORKERS_PER_HOST):
+        self.session = session
+        self.store = store
+        self.per_host = per_host
+        self.count = 0  # Images downloaded over the network
+        self.reused = 0  # Image references served from the store
+        self._executor = ThreadPoolExecutor(max_workers=workers)
+        self._host_slots = {}
+        self._fetches = {}
+        self._lock = threading.Lock()
+
+    def _host_slot(self, host):
+        with self._lock:
+            if host not in self._host_slots:
+                self._host_slots[host] = threading.Semaphore(self.per_host)
+            return self._host_slots[host]
+
+    def _download(self, image_url):
+        with self._host_slot(urlparse(image_url).netloc):
+            stored_name, downloaded = download_image(self.session, self.store, image_url)
+        with self._lock:
+            if downloaded:
+                self.count += 1
+            elif stored_name:
+                self.reused += 1
+        return stored_name
+
+    def submit(self, image_url, site_url):
+        """Queue an image download; returns a future for its stored filename."""
+        image_url = resolve_image_url(image_url, site_url)
+        with self._lock:
+            future = self._fetches.get(image_url)
+            if future is None:
+                future = self._executor.submit(self._download, image_url)
+                self._fetches[image_url] = future
+            else:
+                self.reused += 1
+        return future
+
+    def shutdown(self):
+        self._executor.shutdown(wait=True)
+        self.store.save()
+
+def prepare_post(post):
+    """Extract a post's title, date and categories and convert its HTML.
+
+    This is the CPU-bound part of exporting a post. It only uses the post
+    itself, so it can run in a worker process; the content comes back as a
+    MarkdownDocument whose image links are filled in later.
+    """
+    categories = []
+    if '_embedded' in post and 'wp:term' in post['_embedded']:
+        for terms in post['_embedded']['wp:term']:
+            for term in terms:
+                if term['taxonomy'] == 'category':
+                    categories.append(html_to_text(term['name']))
+
+    return {
+        'title': html_to_text(post['title']['rendered']),
+        'document': html_to_markdown(post['content']['rendered']),
+        'date': parse_wp_date(post['date']).strftime('%Y-%m-%d %H:%M:%S'),
+        'categories': categories or ['uncategorized']
+    }
+
+def iter_prepared_posts(posts, pool=None):
+    """Yield (post, get_prepared) for every post, in order.
+
+    With a process pool, up to CONVERT_AHEAD posts are converted ahead of
+    the consumer, so conversion overlaps with downloading images
+    and writing files while memory stays bounded. get_prepared() returns
+    prepare_post's result, or raises its error.
+    """
+    if pool is None:
+        for post in posts:
+            yield post, lambda post=post: prepare_post(post)
+        return
+
+    pending = deque()
+    for post in posts:
+        pending.append((post, pool.submit(prepare_post, post)))
+        if len(pending) >= CONVERT_AHEAD:
+            post, future = pending.popleft()
+            yield post, future.result
+    while pending:
+        post, future = pending.popleft()
+        yield post, future.result
+
+def create_convert_pool(workers=CONVERT_WORKERS):
+    """Return a process pool for prepare_post, or None to convert in-thread."""
+    if workers is None or workers <= 1:
+        return None
+    return ProcessPoolExecutor(max_workers=workers)
+
+def start_image_downloads(downloader, document, site_url):
+    """Queue every image of a converted post; returns {src: future}."""
+    downloads = {}
+    for src in document.images:
+        if src not in downloads:
+            downloads[src] = downloader.submit(src, site_url)
+    return downloads
+
+def process_content(downloader, output, document, downloads, category):
+    """Wait for a post's images and relink them; returns the Markdown.
+
+    The downloads come from start_image_downloads, so they can run while
+    earlier posts are still being written.
+    """
+    # Add stored images to the category's images folder
+    links = {}
+    for src, future in downloads.items():
+        stored_name = future.result()
+        if stored_name:
+            output.add_image(f'{category}/images/{stored_name}', downloader.store.path(stored_name))
+            links[src] = f'images/{stored_name}'
     
-    return content
+    return document.render(links.get)
+
+def yaml_string(value):
+    # JSON strings are valid double-quoted YAML scalars
+    return json.dumps(value, ensure_ascii=False)
 
 def create_markdown_content(post_data):
-    content = f"# {post_data['title']}\n\n"
-    content += f"Date: {post_data['date']}\n\n"
-    content += f"Categories: {', '.join(post_data['categories'])}\n\n"
+    content = "---\n"
+    content += f"title: {yaml_string(post_data['title'])}\n"
+    content += f"date: {yaml_string(post_data['date'])}\n"
+    content += "categories:\n"
+    for category in post_data['categories']:
+        content += f"  - {yaml_string(category)}\n"
     content += "---\n\n"
+    content += f"# {post_data['title']}\n\n"
     content += post_data['content']
     return content
 
-def get_posts(session, site_url, per_page=100, page=1):
+class SyncState:
+    """Persistent record of a site's previous exports.
+
+    Stores the start time of the last completed export, the validators
+    (ETag/Last-Modified) of the first post page, and for every exported post
+    its modified_gmt, file path, title, date and categories. Later runs use
+    it to fetch and write only what changed, and it is the source for the
+    per-category indexes.
+
+    While a run is in progress the state also holds a checkpoint of the
+    last finished page, and every written post is appended to a journal
+    file, so an interrupted run can resume without redoing finished work.
+    """
+
+    def __init__(self, path, journal=True):
+        self.path = path
+        self.journal_path = path + '.journal'
+        self.journal = journal
+        self.last_export = None
+        self.posts = {}
+        self.etag = None
+        self.last_modified = None
+        self.run = None  # Checkpoint of an unfinished run
+        self.validators = None  # First page ETag/Last-Modified seen this run
+        self.not_modified = False  # Set when the server answered 304 this run
+        self._lock = threading.Lock()
+        if os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            self.last_export = data.get('last_export')
+            self.posts = data.get('posts', {})
+            self.etag = data.get('etag')
+            self.last_modified = data.get('last_modified')
+            self.run = data.get('run')
+        self._journal = None
+        if journal:
+            if os.path.exists(self.journal_path):
+                # Replay posts written after the last full save
+                with open(self.journal_path, 'r', encoding='utf-8') as f:
+                    for line in f:
+                        try:
+                            self.posts.update(json.loads(line))
+                        except ValueError:
+                            break  # Torn final line from a crash
+            self._journal = open(self.journal_path, 'a', encoding='utf-8')
+        # Which post owns each path, to keep colliding slugs apart
+        self._owners = {entry['path']: post_id for post_id, entry in self.posts.items()}
+
+    def is_current(self, post):
+        """True if this exact revision of the post was already exported."""
+        with self._lock:
+            entry = self.posts.get(str(post['id']))
+            return entry is not None and entry['modified_gmt'] == post.get('modified_gmt')
+
+    def knows(self, post):
+        """True if an earlier run exported any revision of the post."""
+        with self._lock:
+            return str(post['id']) in self.posts
+
+    def path_of(self, post):
+        """Path (relative to the site folder) the post was last written to."""
+        with self._lock:
+            entry = self.posts.get(str(post['id']))
+            return entry['path'] if entry else None
+
+    def owner_of(self, path):
+        """Id of the post last written to `path`, or None."""
+        with self._lock:
+            return self._owners.get(path)
+
+    def record(self, post, path, title, date, categories):
+        entry = {
+            'modified_gmt': post.get('modified_gmt'),
+            'path': path,
+            'title': title,
+            'date': date,
+            'categories': categories
+        }
+        with self._lock:
+            previous = self.posts.get(str(post['id']))
+            if previous and self._owners.get(previous['path']) == str(post['id']):
+                del self._owners[previous['path']]
+            self.posts[str(post['id'])] = entry
+            self._owners[path] = str(post['id'])
+            if self._journal:
+                self._journal.write(json.dumps({str(post['id']): entry}) + '\n')
+                self._journal.flush()
+
+    def conditional_headers(self):
+        headers = {}
+        if self.etag:
+            headers['If-None-Match'] = self.etag
+        if self.last_modified:
+            headers['If-Modified-Since'] = self.last_modified
+        return headers
+
+    def begin_run(self, after):
+        """Start a run, or pick up the checkpoint of an interrupted one."""
+        with self._lock:
+            if self.run is None:
+                self.run = {
+                    'started': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+                    'after': after,
+                    'pages_done': 0
+                }
+            return self.run
+
+    def checkpoint_page(self, page):
+        """Mark every page up to `page` as finished and save."""
+        with self._lock:
+            self.run['pages_done'] = page
+        self.save()
+
+    def finish_run(self):
+        """Move the sync point to the start of the finished run and save."""
+        with self._lock:
+            if self.run:
+                self.last_export = self.run['started']
+            if self.validators:
+                self.etag, self.last_modified = self.validators
+            self.run = None
+        self.save()
+
+    def save(self):
+        with self._lock:
+            data = {
+                'last_export': self.last_export,
+                'etag': self.etag,
+                'last_modified': self.last_modified,
+                'run': self.run,
+                'posts': self.posts
+            }
+            partial_path = self.path + '.part'
+            with open(partial_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f)
+            os.replace(partial_path, self.path)
+            # Everything in the journal is now in the state file
+            if self._journal:
+                self._journal.truncate(0)
+
+    def close(self):
+        if self._journal:
+            self._journal.close()
+
+def write_category_indexes(output, state):
+    """Write a README.md in every category folder listing all of its posts.
+
+    Each post is stored once, so the index is how a category links to posts
+    that live in another category's folder.
+    """
+    # Categories whose names map to the same folder share one index
+    folders = {}
+    for entry in state.posts.values():
+        for category in entry['categories']:
+            names, entries = folders.setdefault(category_folder(category), ({}, {}))
+            names[category] = None
+            entries[entry['path']] = entry
+
+    for category_dir, (names, entries) in folders.items():
+        lines = [f"# {' / '.join(names)}\n\n"]
+        for entry in sorted(entries.values(), key=lambda e: e['date'], reverse=True):
+            link = posixpath.relpath(entry['path'], category_dir)
+            lines.append(f"- [{entry['title']}]({link}) - {entry['date']}\n")
+        output.write(f'{category_dir}/README.md', ''.join(lines))
+
+def iter_json_array(chunks):
+    """Yield the items of a top-level JSON array from an iterable of byte chunks.
+
+    Each item is decoded as soon as it is complete, so only the current item
+    and the unparsed tail of the stream are held in memory.
+    """
+    decoder = json.JSONDecoder()
+    text = codecs.getincrementaldecoder('utf-8')()
+    buffer = ''
+    pos = 0
+    started = False
+    expect_value = True
+    retry_at = 0  # Buffer size to reach before re-parsing an incomplete item
+
+    for chunk in itertools.chain(chunks, [None]):
+        final = chunk is None
+        buffer = buffer[pos:] + text.decode(b'' if final else chunk, final=final)
+        pos = 0
+        if not final and len(buffer) < retry_at:
+            continue
+
+        while True:
+            while pos < len(buffer) and buffer[pos] in ' \t\r\n':
+                pos += 1
+            if pos == len(buffer):
+                break
+            char = buffer[pos]
+            if not started:
+                if char != '[':
+                    raise ValueError("Expected a JSON array")
+                started = True
+                pos += 1
+            elif char == ']':
+                return
+            elif not expect_value:
+                if char != ',':
+                    raise ValueError(f"Unexpected {char!r} in JSON array")
+                expect_value = True
+                pos += 1
+            else:
+                try:
+                    item, end = decoder.raw_decode(buffer, pos)
+                except json.JSONDecodeError:
+                    if final:
+                        raise
+                    # Wait until the buffer doubles so long items are not re-parsed per chunk
+                    retry_at = 2 * (len(buffer) - pos)
+                    break
+                if not final and (end == len(buffer) or buffer[end] in '.eE+-0123456789'):
+                    break  # A number could continue in the next chunk
+                yield item
+                pos = end
+                expect_value = False
+                retry_at = 0
+
+    raise ValueError("Truncated JSON array")
+
+class _ChunkReader:
+    """Minimal file object over byte chunks, for ijson."""
+
+    def __init__(self, chunks):
+        self._chunks = iter(chunks)
+
+    def read(self, size=-1):
+        return next(self._chunks, b'')
+
+class PostStream:
+    """Posts of one API page, parsed from the response as it downloads.
+
+    Uses ijson when it is installed and iter_json_array otherwise. If the
+    download breaks off, the page is requested again with `reopen` and the
+    posts already yielded are skipped. The response is closed once the posts
+    are exhausted or close() is called.
+
+    The page is read while its posts' images download, so it gives its
+    request slot back as soon as the headers are in; holding it could leave
+    those downloads waiting for a page that is waiting for them.
+    """
+
+    def __init__(self, session, response, reopen=None):
+        self.session = session
+        self.response = self._detach(response)
+        self._reopen = reopen
+
+    @staticmethod
+    def _detach(response):
+        release_slot = getattr(response, 'release_slot', None)
+        if release_slot is not None:
+            release_slot()
+        return response
+
+    def _chunks(self):
+        for chunk in self.response.iter_content(chunk_size=64 * 1024):
+            self.session.count_bytes(len(chunk))
+            yield chunk
+
+    def _parse(self):
+        if ijson is not None:
+            return ijson.items(_ChunkReader(self._chunks()), 'item', use_float=True)
+        return iter_json_array(self._chunks())
+
+    def __iter__(self):
+        done = 0
+        attempt = 0
+        try:
+            while True:
+                try:
+                    for index, post in enumerate(self._parse()):
+                        if index >= done:
+                            done += 1
+                            yield post
+                    return
+                except requests.exceptions.RequestException as e:
+                    if self._reopen is None or attempt >= PAGE_RETRIES:
+                        raise
+                    attempt += 1
+                    print(f"Page download broke off ({e}); requesting it again")
+                    self.close()
+                    self.response = self._detach(self._reopen())
+                    self.response.raise_for_status()
+        finally:
+            self.close()
+
+    def close(self):
+        self.response.close()
+
+def get_posts(session, site_url, per_page=100, page=1, state=None, after=None):
     # Special handling for TechCrunch
     if 'techcrunch.com' in site_url:
         url = "https://techcrunch.com/wp-json/wp/v2/posts"
@@ -115,8 +897,15 @@ def get_posts(session, site_url, per_page=100, page=1):
         'per_page': per_page,
         'page': page,
         'status': 'publish',
-        '_embed': 'true'
+        # Oldest first, so new posts do not shift pages a resumed run has finished
+        'orderby': 'date',
+        'order': 'asc',
+        # Embed only the taxonomy terms (for categories) and project the fields we use
+        '_embed': 'wp:term',
+        '_fields': POST_FIELDS
     }
+    if after:
+        params['after'] = after
     
     headers = {
         'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/121.0.0.0 Safari/537.36',
@@ -125,26 +914,98 @@ def get_posts(session, site_url, per_page=100, page=1):
         'Connection': 'keep-alive'
     }
     
+    # Incremental export: only ask for posts changed since the last run
+    if state and state.last_export:
+        params['modified_after'] = state.last_export
+        if page == 1:
+            headers.update(state.conditional_headers())
+    
     try:
+        # Stream the body so posts can be processed while the page downloads
         response = session.get(
             url,
             params=params,
             headers=headers,
             timeout=30,
+            stream=True,
         )
-        response.raise_for_status()
-        
-        if response.status_code == 200:
-            total_pages = int(response.headers.get('X-WP-TotalPages', 1))
-            return response.json(), total_pages
-        return None, 0
+        # A re-request must not be answered 304 after part of the page was used
+        retry_headers = {k: v for k, v in headers.items() if not k.startswith('If-')}
+        if response.status_code == 304:
+            response.close()
+            state.not_modified = True
+            return [], 0
+        if response.status_code == 400 and page > 1 and b'rest_post_invalid_page_number' in response.content:
+            # Past the last page, e.g. when resuming a run that had finished
+            # every page, or after posts were deleted
+            response.close()
+            return [], 0
+        if response.status_code != 200:
+            response.close()
+            response.raise_for_status()
+            return None, 0
+
+        total_pages = int(response.headers.get('X-WP-TotalPages', 1))
+        if state and page == 1:
+            state.validators = (response.headers.get('ETag'), response.headers.get('Last-Modified'))
+        reopen = lambda: session.get(url, params=params, headers=retry_headers, timeout=30, stream=True)
+        return PostStream(session, response, reopen), total_pages
     except requests.exceptions.RequestException as e:
         print(f"Error accessing the API: {str(e)}")
         return None, 0
 
-def file_exists_check(filepath):
-    if os.path.exists(filepath):
-        response = input(f"File {filepath} already exists. Do you want to overwrite? (y/n): ")
+def iter_post_pages(session, site_url, workers=PAGE_WORKERS, state=None, after=None, start_page=1):
+    """Yield (page, total_pages, posts) for every page of posts, in order.
+
+    The first page (`start_page`, when resuming) is fetched alone to learn
+    X-WP-TotalPages; the remaining pages are requested concurrently, at most `workers` at a time, and yielded
+    in page order. Each page's posts are an iterator parsed from the response
+    as it arrives. Raises RuntimeError if a page request fails, and the
+    iteration raises if a page breaks off, so callers can tell an
+    interrupted export from a complete one.
+    """
+    posts, total_pages = get_posts(session, site_url, page=start_page, state=state, after=after)
+    if state and state.not_modified:
+        print("Site has not changed since the last export.")
+        return
+    if posts is None:
+        raise RuntimeError(f"Could not fetch page {start_page} of posts")
+    posts = iter(posts)
+    first_post = next(posts, None)
+    if first_post is None:
+        if start_page > 1:
+            return  # Resumed past the last page
+        if state and state.last_export:
+            print("No posts changed since the last export.")
+        else:
+            print("No posts found.")
+        return
+    yield start_page, total_pages, itertools.chain([first_post], posts)
+
+    if total_pages <= start_page:
+        return
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        pending = deque()
+        next_page = start_page + 1
+        while next_page <= total_pages or pending:
+            # Keep a bounded window of pages in flight
+            while next_page <= total_pages and len(pending) < workers:
+                pending.append((next_page, executor.submit(get_posts, session, site_url, page=next_page, state=state, after=after)))
+                next_page += 1
+
+            page, future = pending.popleft()
+            posts, _ = future.result()
+            if posts is None:
+                for _, later in pending:
+                    if not later.cancel() and later.result()[0] is not None:
+                        later.result()[0].close()
+                raise RuntimeError(f"Could not fetch page {page} of posts")
+            yield page, total_pages, posts
+
+def file_exists_check(output, relpath):
+    if output.exists(relpath):
+        response = input(f"File {relpath} already exists. Do you want to overwrite? (y/n): ")
         return response.lower() == 'y'
     return True
 
@@ -157,7 +1018,7 @@ def get_date_filter():
         print("4. Everything")
         choice = input("Enter your choice (1-4): ").strip()
         
-        now = datetime.now()
+        now = datetime.now(timezone.utc)
         if choice == '1':
             return now - timedelta(days=1)
         elif choice == '2':
@@ -174,7 +1035,401 @@ def parse_wp_date(date_str):
     normalized = date_str.replace('Z', '+00:00')
     return datetime.fromisoformat(normalized)
 
+def normalize_site_url(site_url):
+    # Remove trailing slash if present
+    site_url = site_url.rstrip('/')
+    
+    # For TechCrunch, use the direct URL
+    if 'techcrunch.com' in site_url:
+        site_url = 'https://techcrunch.com'
+    return site_url
+
+def check_site(session, site_url):
+    """Return None if the site's REST API is reachable, else an error message."""
+    try:
+        test_response = session.get(f"{site_url}/wp-json/wp/v2/posts", timeout=30)
+        if test_response.status_code == 200:
+            return None
+        elif test_response.status_code == 401:
+            return f"The site {site_url} requires authentication."
+        return f"Could not access WordPress API at {site_url} (HTTP {test_response.status_code})"
+    except requests.exceptions.RequestException as e:
+        return f"Error accessing the site: {e}"
+
+def export_site(session, site_url, output_dir=None, date_filter=None, overwrite=None, interactive=True,
+                search_index=False, output=None, pool=None):
+    """Export one site's posts into output_dir and return a summary dict.
+
+    overwrite decides what happens to existing files the exporter did not
+    write itself: True or False, or None to ask (interactive mode only;
+    non-interactive runs default to overwriting). Progress is checkpointed
+    after every post and page, so re-running after a crash resumes where
+    the previous run stopped. With search_index, titles and bodies are also
+    added to a full-text index in the output folder (see wp_search.py).
+
+    The posts go to `output`, a DirectoryOutput for output_dir by default, or
+    a GitOutput to commit them to a git branch instead; output_dir then only
+    holds the export state and image cache. The output is closed when the
+    export ends. `pool` is an optional ProcessPoolExecutor that converts
+    posts to Markdown in parallel (see iter_prepared_posts).
+    """
+    if output_dir is None:
+        # Extract domain name from URL for the output directory
+        output_dir = sanitize_filename(urlparse(site_url).netloc)
+    os.makedirs(output_dir, exist_ok=True)
+    if output is None:
+        output = DirectoryOutput(output_dir)
+    if overwrite is None and not interactive:
+        overwrite = True
+    started = time.monotonic()
+    session = SiteSession(session)
+
+    total_posts = 0
+    failed_posts = 0
+    unique_posts = set()  # Track unique posts
+    # Outputs that save in batches checkpoint only what they have saved, so no journal
+    state = SyncState(os.path.join(output_dir, '.export-state.json'), journal=output.durable)
+    downloader = ImageDownloader(session, ImageStore(os.path.join(output_dir, '.images')))
+    overwrite_all = overwrite
+    index = None
+    if search_index:
+        index = SearchIndex(os.path.join(output_dir, INDEX_NAME))
+        if index.created and state.posts:
+            print(f"Indexed {index_exported_posts(index, output, state.posts)} previously exported posts.")
+
+    if state.run:
+        print(f"\nResuming interrupted export started {state.run['started']} "
+              f"after page {state.run['pages_done']}.")
+    elif state.last_export:
+        # Incremental runs only fetch changes, so no date filter is needed
+        print(f"\nPrevious export found ({state.last_export}). Only posts changed since then will be exported.")
+        print(f"Delete {state.path} to run a full export.")
+        date_filter = None
+    elif interactive and date_filter is None:
+        date_filter = get_date_filter()
+
+    # The date filter is applied by WordPress via the 'after' parameter
+    run = state.begin_run(date_filter.isoformat(timespec='seconds') if date_filter else None)
+    state.save()
+
+    # Posts whose images are downloading, waiting to be written in order, and
+    # the paths they will take (not yet recorded in the state)
+    ahead = deque()
+    claimed = {}
+
+    def owner_of(path):
+        return claimed.get(path) or state.owner_of(path)
+
+    def post_failed(post, error):
+        nonlocal failed_posts
+        if interactive:
+            raise error
+        # Unattended runs log the post and keep going
+        print(f"Error exporting post {post.get('id')}: {error}")
+        failed_posts += 1
+
+    def start_post(post, prepared):
+        """Decide where and whether a post is written, and start its image downloads."""
+        nonlocal overwrite_all
+        # Files written by an earlier run are ours to update
+        previously_exported = state.knows(post)
+        post_data = prepared()
+
+        # Write the post once, into its first category
+        category = category_folder(post_data['categories'][0])
+        relpath = post_path(category, post_data['title'], post['id'], owner_of)
+        claimed[relpath] = str(post['id'])
+
+        # Check if file exists and handle overwrite
+        if overwrite_all is None and not previously_exported and output.exists(relpath):
+            response = input("Files already exist. Do you want to: \n"
+                          "1. Ask for each file\n"
+                          "2. Overwrite all\n"
+                          "3. Skip all existing\n"
+                          "Choose (1/2/3): ")
+            if response == '2':
+                overwrite_all = True
+            elif response == '3':
+                overwrite_all = False
+
+        if previously_exported or not output.exists(relpath):
+            should_write = True
+        elif overwrite_all is not None:
+            should_write = overwrite_all
+        else:
+            should_write = file_exists_check(output, relpath)
+
+        downloads = None
+        if should_write:
+            downloads = start_image_downloads(downloader, post_data['document'], site_url)
+        return post, post_data, category, relpath, downloads
+
+    def finish_post(post, post_data, category, relpath, downloads):
+        """Write a post once its images are downloaded and record it.
+
+        Posts left out in favour of an existing file are not recorded, so
+        a later run offers them again.
+        """
+        nonlocal total_posts
+        claimed.pop(relpath, None)
+        try:
+            if downloads is not None:
+                # Update image references to the downloaded copies
+                post_data['content'] = process_content(downloader, output, post_data['document'],
+                                                       downloads, category)
+
+                output.write(relpath, create_markdown_content(post_data))
+                if index:
+                    index.add(post['id'], relpath, post_data['title'], post_data['date'],
+                              post_data['categories'], post_data['content'])
+                print(f"Processed post: {post_data['title']}")
+                unique_posts.add(post_data['title'])  # Add to unique posts set
+
+                # A renamed post leaves its previous file behind
+                old_relpath = state.path_of(post)
+                if old_relpath and old_relpath != relpath:
+                    output.remove(old_relpath)
+            else:
+                print(f"Skipped existing post: {post_data['title']}")
+        except Exception as e:
+            post_failed(post, e)
+            return
+
+        total_posts += 1
+        if downloads is None:
+            # The file is the user's, not an export of this post
+            return
+
+        # Other categories reference this file from their README.md index
+        state.record(post, relpath, post_data['title'], post_data['date'], post_data['categories'])
+
+    completed = False
+    try:
+        pages = iter_post_pages(session, site_url, state=state, after=run['after'],
+                                start_page=run['pages_done'] + 1)
+        for page, total_pages, posts in pages:
+            # Skip posts whose current revision was already exported
+            fresh_posts = (post for post in posts if not state.is_current(post))
+            for post, prepared in iter_prepared_posts(fresh_posts, pool):
+                try:
+                    ahead.append(start_post(post, prepared))
+                except Exception as e:
+                    post_failed(post, e)
+                # Write posts in order, once their images are in
+                if len(ahead) >= POSTS_AHEAD:
+                    finish_post(*ahead.popleft())
+            while ahead:
+                finish_post(*ahead.popleft())
+
+            if index:
+                index.commit()
+            # Images stored so far need not be downloaded again after a crash
+            downloader.store.save()
+            # Checkpoint only once the output has saved the page's posts
+            if output.flush(total_posts):
+                if failed_posts:
+                    # Keep the checkpoint before the first failure so a re-run retries it
+                    state.save()
+                else:
+                    state.checkpoint_page(page)
+            print(f"Processed page {page}/{total_pages} - Total posts: {total_posts}")
+        completed = failed_posts == 0
+    except Exception as e:
+        print(f"Error during export: {str(e)}")
+    finally:
+        downloader.shutdown()
+        write_category_indexes(output, state)
+        output.close(f"Export {site_url}: {total_posts} posts")
+        # Only move the sync point forward after a complete run
+        if completed:
+            state.finish_run()
+        else:
+            state.save()
+        state.close()
+        if index:
+            if completed:
+                index.optimize()
+            index.close()
+
+    return {
+        'site': site_url,
+        'output_dir': output_dir,
+        'posts': total_posts,
+        'unique_posts': len(unique_posts),
+        'failed_posts': failed_posts,
+        'images': downloader.count,
+        'images_reused': downloader.reused,
+        'bytes': session.bytes,
+        'elapsed': round(time.monotonic() - started, 2),
+        'completed': completed
+    }
+
+def print_summary(summary):
+    if summary['posts'] > 0:
+        print(f"\nExport completed successfully!" if summary['completed'] else "\nExport incomplete; re-run to resume.")
+        print(f"Total unique posts exported: {summary['unique_posts']}")
+        print(f"Total images downloaded: {summary['images']}")
+        print(f"Image references served from cache: {summary['images_reused']}")
+        if summary['failed_posts']:
+            print(f"Posts that failed: {summary['failed_posts']}")
+    elif summary['completed']:
+        print("\nExport completed: no new or changed posts.")
+    else:
+        print("\nExport failed: No posts were exported.")
+
+def load_batch_config(config_path):
+    """Read a batch config file.
+
+    The file is JSON: {"output_root": "exports", "sites": [...]}, where each
+    site is a URL string or an object with "url" and optional "output",
+    "since_days", "overwrite", "search_index", "git_repo", "git_branch" and
+    "commit_every" keys. Optional top-level "parallel_sites", "max_requests"
+    and "max_bytes_per_second" keys set the multi-site limits, and top-level
+    "search_index", "git_repo" and "commit_every" set defaults for every
+    site. Sites written to a git repository get a branch named after their
+    output folder unless "git_branch" is given.
+    """
+    with open(config_path, 'r', encoding='utf-8') as f:
+        config = json.load(f)
+
+    output_root = config.get('output_root', '.')
+    search_index = config.get('search_index', False)
+    git_repo = config.get('git_repo')
+    commit_every = config.get('commit_every')
+    sites = []
+    for entry in config.get('sites', []):
+        if isinstance(entry, str):
+            entry = {'url': entry}
+        site_url = normalize_site_url(entry['url'])
+        since_days = entry.get('since_days')
+        folder = entry.get('output') or sanitize_filename(urlparse(site_url).netloc)
+        sites.append({
+            'url': site_url,
+            'output_dir': os.path.join(output_root, folder),
+            'date_filter': datetime.now(timezone.utc) - timedelta(days=since_days) if since_days else None,
+            'overwrite': entry.get('overwrite', True),
+            'search_index': entry.get('search_index', search_index),
+            'git_repo': entry.get('git_repo', git_repo),
+            'git_branch': entry.get('git_branch') or folder,
+            'commit_every': entry.get('commit_every', commit_every)
+        })
+    return {
+        'output_root': output_root,
+        'sites': sites,
+        'parallel_sites': config.get('parallel_sites', 1),
+        'max_requests': config.get('max_requests'),
+        'max_bytes_per_second': config.get('max_bytes_per_second')
+    }
+
+def export_batch_site(sessions, site, pool=None):
+    print(f"\n=== {site['url']} ===")
+    session = sessions[urlparse(site['url']).netloc]
+    error = check_site(session, site['url'])
+    if error:
+        print(f"Error ({site['url']}): {error}")
+        return {'site': site['url'], 'output_dir': site['output_dir'], 'posts': 0,
+                'images': 0, 'bytes': 0, 'elapsed': 0, 'completed': False, 'error': error}
+    try:
+        output = None
+        if site['git_repo']:
+            output = GitOutput(site['git_repo'], site['git_branch'], site['commit_every'],
+                               f"Export {site['url']}")
+        summary = export_site(session, site['url'], site['output_dir'], site['date_filter'],
+                              overwrite=site['overwrite'], interactive=False,
+                              search_index=site['search_index'], output=output, pool=pool)
+    except Exception as e:
+        print(f"Error ({site['url']}): {e}")
+        return {'site': site['url'], 'output_dir': site['output_dir'], 'posts': 0,
+                'images': 0, 'bytes': 0, 'elapsed': 0, 'completed': False, 'error': str(e)}
+    print(f"\n=== {site['url']} done ===")
+    print_summary(summary)
+    return summary
+
+def run_batch(config_path, verify_ssl=True, parallel_sites=None, max_requests=None, max_bytes_per_second=None,
+              search_index=False, convert_workers=CONVERT_WORKERS):
+    """Export every site in a config file without prompting.
+
+    Up to `parallel_sites` sites are exported at once. Sites on the same
+    host share one pooled session, and every session draws on a single
+    TransferBudget, and all sites share one pool of `convert_workers`
+    processes for Markdown conversion. Arguments left as None fall back to
+    the config file; search_index=True indexes every site regardless of the
+    config.
+    A per-site summary is written to export-summary.json in the output
+    root. Returns True if every site exported completely; a failing site is
+    reported and the others continue.
+    """
+    config = load_batch_config(config_path)
+    if search_index:
+        for site in config['sites']:
+            site['search_index'] = True
+    parallel_sites = max(1, parallel_sites or config['parallel_sites'] or 1)
+    budget = TransferBudget(max_requests or config['max_requests'],
+                            max_bytes_per_second or config['max_bytes_per_second'])
+
+    # One connection pool per host, sized for every site on that host
+    sessions = {}
+    for site in config['sites']:
+        host = urlparse(site['url']).netloc
+        if host not in sessions:
+            sites_on_host = sum(1 for s in config['sites'] if urlparse(s['url']).netloc == host)
+            pool_size = (PAGE_WORKERS + IMAGE_WORKERS) * min(sites_on_host, parallel_sites)
+            sessions[host] = create_session(verify_ssl, pool_size=pool_size, budget=budget)
+
+    started = time.monotonic()
+    pool = create_convert_pool(convert_workers)
+    try:
+        with ThreadPoolExecutor(max_workers=parallel_sites) as executor:
+            results = list(executor.map(lambda site: export_batch_site(sessions, site, pool), config['sites']))
+    finally:
+        if pool:
+            pool.shutdown()
+    elapsed = round(time.monotonic() - started, 2)
+
+    print("\nBatch summary:")
+    for summary in results:
+        status = 'ok' if summary['completed'] else 'INCOMPLETE'
+        print(f"  {summary['site']}: {summary['posts']} posts, {summary['images']} images, "
+              f"{summary['bytes'] / 1e6:.1f} MB in {summary['elapsed']:.1f}s, {status}")
+    print(f"Total: {sum(s['bytes'] for s in results) / 1e6:.1f} MB in {elapsed:.1f}s")
+
+    os.makedirs(config['output_root'], exist_ok=True)
+    summary_path = os.path.join(config['output_root'], 'export-summary.json')
+    with open(summary_path, 'w', encoding='utf-8') as f:
+        json.dump({'elapsed': elapsed, 'sites': results}, f, indent=2)
+    print(f"Summary written to {summary_path}")
+    return all(summary['completed'] for summary in results)
+
 def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Export WordPress posts into categorized Markdown files')
+    parser.add_argument('--config', help='JSON file listing sites to export without prompts (batch mode)')
+    parser.add_argument('--parallel-sites', type=int, help='Sites to export at once in batch mode')
+    parser.add_argument('--max-requests', type=int, help='Maximum HTTP requests in flight across all sites')
+    parser.add_argument('--max-bytes-per-second', type=int, help='Maximum combined download rate across all sites')
+    parser.add_argument('--search-index', action='store_true',
+                        help='Build a full-text search index of the posts (query it with wp_search.py)')
+    parser.add_argument('--git-repo', help='Commit the posts to this git repository instead of writing files')
+    parser.add_argument('--git-branch', default='main', help='Branch to commit to with --git-repo')
+    parser.add_argument('--commit-every', type=int,
+                        help='With --git-repo, commit every N posts instead of once per run')
+    parser.add_argument('--convert-workers', type=int, default=CONVERT_WORKERS,
+                        help='Processes converting posts to Markdown (default: one per CPU; 1 disables)')
+    args = parser.parse_args()
+
+    allow_insecure = os.environ.get("ALLOW_INSECURE_SSL", "false").lower() == "true"
+    if allow_insecure:
+        print("Insecure SSL allowed via ALLOW_INSECURE_SSL env var. Certificates will not be verified.\n")
+    verify_ssl = not allow_insecure
+
+    if args.config:
+        sys.exit(0 if run_batch(args.config, verify_ssl, args.parallel_sites,
+                                args.max_requests, args.max_bytes_per_second, args.search_index,
+                                args.convert_workers) else 1)
+
+    session = create_session(verify_ssl, pool_size=PAGE_WORKERS + IMAGE_WORKERS)
+
     print("WordPress Post Exporter")
     print("Note: This tool only works with WordPress sites that have a public API enabled.")
     print("Some popular sites may require authentication and won't work with this tool.")
@@ -183,12 +1438,6 @@ def main():
     print("- https://wordpress.org/news")
     print("- https://wptavern.com")
     print("- https://make.wordpress.org\n")
-
-    allow_insecure = os.environ.get("ALLOW_INSECURE_SSL", "false").lower() == "true"
-    if allow_insecure:
-        print("Insecure SSL allowed via ALLOW_INSECURE_SSL env var. Certificates will not be verified.\n")
-    verify_ssl = not allow_insecure
-    session = create_session(verify_ssl)
     
     while True:
         site_url = input("Enter the WordPress site URL (e.g., https://example.com): ").strip()
@@ -197,146 +1446,27 @@ def main():
         if not site_url.startswith(('http://', 'https://')):
             print("Error: URL must start with http:// or https://")
             continue
-            
-        # Remove trailing slash if present
-        site_url = site_url.rstrip('/')
-        
-        # For TechCrunch, use the direct URL
-        if 'techcrunch.com' in site_url:
-            site_url = 'https://techcrunch.com'
+        site_url = normalize_site_url(site_url)
         
         # Test if the site is accessible and has WordPress API
-        try:
-            test_response = session.get(f"{site_url}/wp-json/wp/v2/posts")
-            if test_response.status_code == 200:
-                break
-            elif test_response.status_code == 401:
-                print(f"\nError: The site {site_url} requires authentication.")
-                print("Please try one of the suggested sites above that have public APIs.")
-                retry = input("\nWould you like to try another site? (y/n): ").lower()
-                if retry != 'y':
-                    sys.exit(0)
-                continue
-            else:
-                print(f"\nError: Could not access WordPress API at {site_url}")
-                print("Please make sure this is a WordPress site with REST API enabled.")
-                retry = input("\nWould you like to try another site? (y/n): ").lower()
-                if retry != 'y':
-                    sys.exit(0)
-                continue
-        except requests.exceptions.RequestException as e:
-            print(f"\nError accessing the site: {e}")
-            retry = input("\nWould you like to try another site? (y/n): ").lower()
-            if retry != 'y':
-                sys.exit(0)
-            continue
-    
-    # Extract domain name from URL for the output directory
-    domain = urlparse(site_url).netloc
-    output_dir = sanitize_filename(domain)
-    if not os.path.exists(output_dir):
-        os.makedirs(output_dir)
-
-    page = 1
-    total_posts = 0
-    unique_posts = set()  # Track unique posts
-    image_counter = [0]  # Use list to allow modification in nested functions
-    
-    # Add before the main loop
-    overwrite_all = None
-
-    # Add date filter selection before starting export
-    date_filter = get_date_filter()
-
-    while True:
-        try:
-            posts, total_pages = get_posts(session, site_url, page=page)
-            if not posts:
-                print("No posts found or error accessing the API.")
-                break
-
-            for post in posts:
-                # Check if post is within the selected time period
-                post_date = parse_wp_date(post['date'])
-                if date_filter and post_date < date_filter:
-                    continue  # Skip posts older than the filter date
-
-                # Extract categories
-                categories = []
-                if '_embedded' in post and 'wp:term' in post['_embedded']:
-                    for terms in post['_embedded']['wp:term']:
-                        for term in terms:
-                            if term['taxonomy'] == 'category':
-                                categories.append(term['name'])
-
-                if not categories:
-                    categories = ['uncategorized']
-
-                post_data = {
-                    'title': post['title']['rendered'],
-                    'content': post['content']['rendered'],
-                    'date': parse_wp_date(post['date']).strftime('%Y-%m-%d %H:%M:%S'),
-                    'categories': categories
-                }
-
-                # Create category directories and save files
-                for category in categories:
-                    category_dir = os.path.join(output_dir, sanitize_filename(category))
-                    if not os.path.exists(category_dir):
-                        os.makedirs(category_dir)
-
-                    filename = f"{sanitize_filename(post_data['title'])}.md"
-                    filepath = os.path.join(category_dir, filename)
-
-                    # Check if file exists and handle overwrite
-                    if overwrite_all is None and os.path.exists(filepath):
-                        response = input("Files already exist. Do you want to: \n"
-                                      "1. Ask for each file\n"
-                                      "2. Overwrite all\n"
-                                      "3. Skip all existing\n"
-                                      "Choose (1/2/3): ")
-                        if response == '2':
-                            overwrite_all = True
-                        elif response == '3':
-                            overwrite_all = False
-
-                    should_write = True
-                    if overwrite_all is not None:
-                        should_write = overwrite_all
-                    elif os.path.exists(filepath):
-                        should_write = file_exists_check(filepath)
-
-                    if should_write:
-                        # Process content to download images and update references
-                        processed_content = process_content(session, post_data['content'], category_dir, post_data['title'], site_url, image_counter)
-                        post_data['content'] = processed_content
-
-                        with open(filepath, 'w', encoding='utf-8') as f:
-                            f.write(create_markdown_content(post_data))
-                        print(f"Processed post: {post_data['title']}")
-                        unique_posts.add(post_data['title'])  # Add to unique posts set
-                    else:
-                        print(f"Skipped existing post: {post_data['title']}")
-
-                    total_posts += 1
-
-            print(f"Processed page {page}/{total_pages} - Total posts: {total_posts}")
-            
-            if page >= total_pages:
-                break
-                
-            page += 1
-            
-        except Exception as e:
-            print(f"Error during export: {str(e)}")
+        error = check_site(session, site_url)
+        if error is None:
             break
+        print(f"\nError: {error}")
+        print("Please try one of the suggested sites above that have public APIs.")
+        retry = input("\nWould you like to try another site? (y/n): ").lower()
+        if retry != 'y':
+            sys.exit(0)
 
-    if total_posts > 0:
-        print(f"\nExport completed successfully!")
-        print(f"Total unique posts exported: {len(unique_posts)}")
-        print(f"Total images downloaded: {image_counter[0]}")
-    else:
-        print("\nExport failed: No posts were exported.")
+    output = None
+    if args.git_repo:
+        output = GitOutput(args.git_repo, args.git_branch, args.commit_every, f"Export {site_url}")
+    pool = create_convert_pool(args.convert_workers)
+    try:
+        print_summary(export_site(session, site_url, search_index=args.search_index, output=output, pool=pool))
+    finally:
+        if pool:
+            pool.shutdown()
 
 if __name__ == "__main__":
     main()
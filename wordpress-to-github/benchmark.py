@@ -0,0 +1,122 @@
+# Benchmark the exporter end to end against a local fake WordPress site
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from fake_wordpress import FakeWordPress
+
+
+EXPORTER = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'ExportWordpressToGithub.py')
+
+# Server settings for each scenario, on top of the command-line options
+SCENARIOS = {
+    'baseline': {},
+    'latency': {'latency': 0.05},
+    'faults': {'error_rate': 0.02, 'drop_rate': 0.01},
+    'rate-limited': {'rate_limit': 50},
+    # Slow API pages next to fast images must not look like congestion
+    'mixed-latency': {'latency': 0.005, 'api_latency': 1.5},
+}
+
+
+def run_exporter(config_path, log_path, extra_args=()):
+    """Run the exporter in batch mode; return (exit code, seconds, peak RSS in MB or None)."""
+    started = time.monotonic()
+    with open(log_path, 'a', encoding='utf-8') as log:
+        process = subprocess.Popen([sys.executable, EXPORTER, '--config', config_path, *extra_args],
+                                   stdout=log, stderr=subprocess.STDOUT)
+        if hasattr(os, 'wait4'):
+            # wait4 reports the resource usage of this child alone
+            _, status, usage = os.wait4(process.pid, 0)
+            process.returncode = os.waitstatus_to_exitcode(status)
+            peak = usage.ru_maxrss / (1024 * 1024 if sys.platform == 'darwin' else 1024)
+        else:
+            process.wait()
+            peak = None
+    return process.returncode, time.monotonic() - started, peak
+
+
+def run_scenario(name, server_options, extra_args=()):
+    """Export a fresh fake site twice (full, then incremental) and return the measurements."""
+    with FakeWordPress(**server_options) as site, tempfile.TemporaryDirectory() as workdir:
+        output_root = os.path.join(workdir, 'export')
+        config_path = os.path.join(workdir, 'sites.json')
+        log_path = os.path.join(workdir, 'export.log')
+        with open(config_path, 'w', encoding='utf-8') as f:
+            json.dump({'output_root': output_root, 'sites': [site.url]}, f)
+
+        code, elapsed, peak = run_exporter(config_path, log_path, extra_args)
+        summary_path = os.path.join(output_root, 'export-summary.json')
+        summary = {'posts': 0, 'images': 0, 'bytes': 0}
+        if os.path.exists(summary_path):
+            with open(summary_path, encoding='utf-8') as f:
+                summary = json.load(f)['sites'][0]
+        served = dict(site.stats)
+        _, rerun_elapsed, _ = run_exporter(config_path, log_path, extra_args)
+
+        if code != 0:
+            with open(log_path, encoding='utf-8') as f:
+                print(f"Export failed in scenario {name}; last lines of the log:")
+                print(''.join(f.readlines()[-10:]))
+
+    return {
+        'scenario': name,
+        'completed': code == 0,
+        'posts': summary['posts'],
+        'images': summary['images'],
+        'seconds': round(elapsed, 2),
+        'posts_per_second': round(summary['posts'] / elapsed, 1),
+        'megabytes': round(summary['bytes'] / 1e6, 2),
+        'peak_rss_mb': round(peak, 1) if peak is not None else None,
+        'rerun_seconds': round(rerun_elapsed, 2),
+        'server': served,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark ExportWordpressToGithub.py against a local fake site')
+    parser.add_argument('--posts', type=int, default=2000)
+    parser.add_argument('--paragraphs', type=int, default=8)
+    parser.add_argument('--images-per-post', type=int, default=2)
+    parser.add_argument('--image-pool', type=int, default=200)
+    parser.add_argument('--scenario', action='append', choices=sorted(SCENARIOS),
+                        help='Scenario to run (repeatable; default: all)')
+    parser.add_argument('--repeat', type=int, default=1, help='Runs per scenario; the median is reported')
+    parser.add_argument('--search-index', action='store_true', help='Also build the search index')
+    parser.add_argument('--json', help='Write the results to this file')
+    args = parser.parse_args()
+
+    extra_args = ['--search-index'] if args.search_index else []
+    results = []
+    for name in args.scenario or list(SCENARIOS):
+        options = dict(posts=args.posts, paragraphs=args.paragraphs, images_per_post=args.images_per_post,
+                       image_pool=args.image_pool, **SCENARIOS[name])
+        runs = []
+        for i in range(args.repeat):
+            print(f"Running {name} ({i + 1}/{args.repeat})...")
+            runs.append(run_scenario(name, options, extra_args))
+        runs.sort(key=lambda r: r['seconds'])
+        results.append(runs[len(runs) // 2])
+        if args.repeat > 1:
+            results[-1]['seconds_stdev'] = round(statistics.stdev(r['seconds'] for r in runs), 2)
+
+    print(f"\n{'scenario':<14}{'posts':>7}{'posts/s':>10}{'MB':>9}{'peak MB':>9}{'seconds':>9}{'rerun s':>9}  status")
+    for r in results:
+        peak = f"{r['peak_rss_mb']:.1f}" if r['peak_rss_mb'] is not None else 'n/a'
+        status = 'ok' if r['completed'] else 'INCOMPLETE'
+        print(f"{r['scenario']:<14}{r['posts']:>7}{r['posts_per_second']:>10.1f}{r['megabytes']:>9.2f}"
+              f"{peak:>9}{r['seconds']:>9.2f}{r['rerun_seconds']:>9.2f}  {status}")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+        print(f"\nResults written to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,221 @@
+# Output backends for the WordPress exporter: a folder tree or a git branch
+import hashlib
+import os
+import shutil
+import subprocess
+import time
+
+
+class DirectoryOutput:
+    """Write exported files into a folder.
+
+    Paths are relative to `root` and use '/' separators. Images are
+    hard-linked from the image store, or copied where the filesystem has no
+    hard links.
+    """
+
+    # Files are safe on disk as soon as they are written
+    durable = True
+
+    def __init__(self, root):
+        self.root = root
+
+    def _path(self, relpath):
+        return os.path.join(self.root, *relpath.split('/'))
+
+    def exists(self, relpath):
+        return os.path.exists(self._path(relpath))
+
+    def read(self, relpath):
+        """Return the text of an exported file, or None if it is missing."""
+        try:
+            with open(self._path(relpath), 'r', encoding='utf-8') as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def write(self, relpath, text):
+        path = self._path(relpath)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(text)
+
+    def remove(self, relpath):
+        if self.exists(relpath):
+            os.remove(self._path(relpath))
+
+    def add_image(self, relpath, source_path):
+        path = self._path(relpath)
+        if os.path.exists(path):
+            return
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        try:
+            os.link(source_path, path)
+        except OSError:
+            shutil.copy2(source_path, path)
+
+    def flush(self, posts_written):
+        """Called after every page; True when everything written is saved."""
+        return True
+
+    def close(self, message=None):
+        pass
+
+
+class GitOutput:
+    """Write exported files straight into a git branch with git fast-import.
+
+    Nothing is written to a working tree: each file is streamed to
+    fast-import as a blob and committed on `branch` of `repo` (created if
+    missing). With `commit_every`, a commit is made at the first page
+    boundary after that many posts; otherwise the whole run is one commit.
+    Commits are checkpointed, so they survive a later crash. Files whose
+    content is already on the branch are skipped, so a run that changes
+    nothing makes no commit. Files committed before this run can be read
+    back with read().
+    """
+
+    durable = False
+
+    def __init__(self, repo, branch='main', commit_every=None, message='Export WordPress posts'):
+        if not os.path.exists(os.path.join(repo, '.git')) and not os.path.exists(os.path.join(repo, 'HEAD')):
+            subprocess.run(['git', 'init', '-q', repo], check=True)
+        self.repo = repo
+        self.ref = f'refs/heads/{branch}'
+        self.commit_every = commit_every
+        self.message = message
+        self.commits = 0
+
+        result = subprocess.run(['git', '-C', repo, 'rev-parse', '--verify', '-q', self.ref + '^{commit}'],
+                                capture_output=True, text=True)
+        self._parent = result.stdout.strip() or None
+        # Blob id of every path on the branch, kept up to date as files change
+        self._tree = {}
+        if self._parent:
+            listing = subprocess.run(['git', '-C', repo, 'ls-tree', '-r', '-z', self._parent],
+                                     capture_output=True, check=True)
+            for line in listing.stdout.split(b'\0'):
+                if line:
+                    info, path = line.split(b'\t', 1)
+                    self._tree[path.decode('utf-8')] = info.split()[2].decode('ascii')
+        self._committer = self._identity()
+
+        self._process = subprocess.Popen(['git', '-C', repo, 'fast-import', '--quiet', '--done'],
+                                         stdin=subprocess.PIPE)
+        self._stream = self._process.stdin
+        self._changes = []  # File commands for the next commit
+        self._image_marks = {}  # Image store path -> blob mark
+        self._next_mark = 1
+        self._posts_committed = 0
+        self._reader = None  # git cat-file --batch, started by the first read()
+
+    def _identity(self):
+        result = subprocess.run(['git', '-C', self.repo, 'var', 'GIT_COMMITTER_IDENT'],
+                                capture_output=True, text=True)
+        if result.returncode == 0:
+            return result.stdout.strip().rsplit(' ', 2)[0]
+        return 'WordPress Exporter <exporter@localhost>'
+
+    @staticmethod
+    def _quote(relpath):
+        if any(c in relpath for c in '"\\\n') or relpath.startswith(' '):
+            escaped = relpath.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+            return f'"{escaped}"'
+        return relpath
+
+    @staticmethod
+    def _blob_id(data):
+        return hashlib.sha1(b'blob %d\0' % len(data) + data).hexdigest()
+
+    def _blob(self, data):
+        mark = self._next_mark
+        self._next_mark += 1
+        self._stream.write(b'blob\nmark :%d\ndata %d\n' % (mark, len(data)))
+        self._stream.write(data)
+        self._stream.write(b'\n')
+        return mark
+
+    def exists(self, relpath):
+        return relpath in self._tree
+
+    def read(self, relpath):
+        """Return the text of a file on the branch, or None if it is missing.
+
+        Only files committed before this run can be read; fast-import has not
+        necessarily stored the ones written since.
+        """
+        blob_id = self._tree.get(relpath)
+        if blob_id is None:
+            return None
+        if self._reader is None:
+            self._reader = subprocess.Popen(['git', '-C', self.repo, 'cat-file', '--batch'],
+                                            stdin=subprocess.PIPE, stdout=subprocess.PIPE)
+        self._reader.stdin.write(blob_id.encode('ascii') + b'\n')
+        self._reader.stdin.flush()
+        header = self._reader.stdout.readline().split()
+        if len(header) != 3:
+            return None  # "<id> missing"
+        data = self._reader.stdout.read(int(header[2]) + 1)[:-1]
+        return data.decode('utf-8')
+
+    def write(self, relpath, text):
+        data = text.encode('utf-8')
+        blob_id = self._blob_id(data)
+        if self._tree.get(relpath) == blob_id:
+            return
+        mark = self._blob(data)
+        self._changes.append(f'M 100644 :{mark} {self._quote(relpath)}')
+        self._tree[relpath] = blob_id
+
+    def remove(self, relpath):
+        if relpath in self._tree:
+            self._changes.append(f'D {self._quote(relpath)}')
+            del self._tree[relpath]
+
+    def add_image(self, relpath, source_path):
+        # Image names are content hashes, so an existing path already has this image
+        if relpath in self._tree:
+            return
+        mark = self._image_marks.get(source_path)
+        if mark is None:
+            with open(source_path, 'rb') as f:
+                mark = self._blob(f.read())
+            self._image_marks[source_path] = mark
+        self._changes.append(f'M 100644 :{mark} {self._quote(relpath)}')
+        self._tree[relpath] = None
+
+    def commit(self, message):
+        if not self._changes:
+            return
+        message = message.encode('utf-8')
+        header = [f'commit {self.ref}', f'committer {self._committer} {int(time.time())} +0000']
+        self._stream.write(('\n'.join(header) + '\n').encode('utf-8'))
+        self._stream.write(b'data %d\n%s\n' % (len(message), message))
+        if self._parent:
+            # Continue the existing branch; later commits in this stream follow on
+            self._stream.write(f'from {self._parent}\n'.encode('utf-8'))
+            self._parent = None
+        self._stream.write(('\n'.join(self._changes) + '\n\ncheckpoint\n\n').encode('utf-8'))
+        self._stream.flush()
+        self._changes = []
+        self.commits += 1
+
+    def flush(self, posts_written):
+        """Commit if commit_every posts were written since the last commit."""
+        if self.commit_every and posts_written - self._posts_committed >= self.commit_every:
+            self.commit(f"{self.message} ({posts_written} posts)")
+            self._posts_committed = posts_written
+            return True
+        return False
+
+    def close(self, message=None):
+        """Commit what is left and wait for fast-import to finish."""
+        if self._reader is not None:
+            self._reader.stdin.close()
+            self._reader.wait()
+            self._reader.stdout.close()
+        self.commit(message or self.message)
+        self._stream.write(b'done\n')
+        self._stream.close()
+        if self._process.wait() != 0:
+            raise RuntimeError(f"git fast-import failed with exit code {self._process.returncode}")
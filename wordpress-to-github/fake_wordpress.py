@@ -0,0 +1,277 @@
+# Local stand-in for the WordPress REST API, for testing and benchmarking the exporter
+import argparse
+import hashlib
+import json
+import math
+import random
+import threading
+import time
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+
+CATEGORIES = ['News', 'Tutorials', 'Releases', 'Community', 'Design', 'Security']
+TAGS = ['python', 'wordpress', 'markdown', 'github', 'export']
+WORDS = ('lorem ipsum dolor sit amet consectetur adipiscing elit sed do eiusmod tempor '
+         'incididunt ut labore et dolore magna aliqua enim ad minim veniam quis nostrud').split()
+FIRST_POST_DATE = datetime(2020, 1, 1, 9, 0, 0)
+
+
+class FakeWordPress:
+    """Threaded HTTP server that serves synthetic WordPress posts and images.
+
+    Implements the parts of /wp-json/wp/v2/posts the exporter uses: paging
+    with X-WP-Total/X-WP-TotalPages, order, after, modified_after, _fields,
+    embedded category and tag terms, and ETag/If-None-Match. Posts are
+    generated from their id, so every run serves the same site.
+
+    Args:
+        posts: Number of posts on the site.
+        paragraphs: Paragraphs of text per post.
+        images_per_post: <img> tags per post.
+        image_pool: Distinct images; posts share them, as real sites do.
+        image_size: Size of each image in bytes.
+        latency: Seconds added to every response.
+        api_latency: Further seconds added to REST API responses, for sites
+            whose pages are slow to build while images come from a cache.
+        error_rate: Fraction of requests answered with a random status from
+            error_statuses (429 and 503 carry Retry-After: 1).
+        drop_rate: Fraction of responses cut off halfway through the body.
+        rate_limit: Requests per second served before answering 429.
+        seed: Seed for error injection.
+        port: Port to listen on; 0 picks a free one.
+    """
+
+    def __init__(self, posts=1000, paragraphs=8, images_per_post=2, image_pool=50, image_size=20000,
+                 latency=0.0, api_latency=0.0, error_rate=0.0, error_statuses=(500, 503, 429), drop_rate=0.0,
+                 rate_limit=None, seed=0, host='127.0.0.1', port=0):
+        self.posts = posts
+        self.paragraphs = paragraphs
+        self.images_per_post = images_per_post
+        self.image_pool = max(1, image_pool)
+        self.image_size = image_size
+        self.latency = latency
+        self.api_latency = api_latency
+        self.error_rate = error_rate
+        self.error_statuses = error_statuses
+        self.drop_rate = drop_rate
+        self.rate_limit = rate_limit
+        self.stats = {'requests': 0, 'bytes': 0, 'errors': 0, 'dropped': 0, 'rate_limited': 0}
+        self._random = random.Random(seed)
+        self._recent = []
+        self._lock = threading.Lock()
+        self._thread = None
+        self.server = ThreadingHTTPServer((host, port), _make_handler(self))
+        self.server.daemon_threads = True
+
+    @property
+    def url(self):
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        """Serve requests on a background thread."""
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    # Site content
+
+    def post(self, post_id):
+        """Return the REST representation of one post."""
+        rng = random.Random(post_id)
+        date = FIRST_POST_DATE + timedelta(hours=7 * (post_id - 1))
+        paragraphs = []
+        for i in range(self.paragraphs):
+            words = ' '.join(rng.choice(WORDS) for _ in range(rng.randint(40, 90)))
+            paragraphs.append(f"<p>{words.capitalize()} <strong>{rng.choice(WORDS)}</strong> "
+                              f"<a href=\"{self.url}/?p={rng.randint(1, self.posts)}\">link</a>.</p>")
+            if i == 1:
+                paragraphs.append("<ul>" + ''.join(f"<li>{rng.choice(WORDS)}</li>" for _ in range(4)) + "</ul>")
+        for i in range(self.images_per_post):
+            image = rng.randrange(self.image_pool)
+            paragraphs.insert(1 + 2 * i, f'<figure><img src="{self.url}/images/{image}.jpg" '
+                                         f'alt="Image {image}"></figure>')
+
+        categories = rng.sample(CATEGORIES, rng.randint(1, 2))
+        return {
+            'id': post_id,
+            'date': date.strftime('%Y-%m-%dT%H:%M:%S'),
+            'modified_gmt': (date + timedelta(days=1)).strftime('%Y-%m-%dT%H:%M:%S'),
+            'title': {'rendered': f"Post {post_id}: {' '.join(rng.choice(WORDS) for _ in range(4)).title()} &amp; more"},
+            'content': {'rendered': '\n'.join(paragraphs), 'protected': False},
+            'categories': [CATEGORIES.index(c) + 1 for c in categories],
+            '_links': {'self': [{'href': f"{self.url}/wp-json/wp/v2/posts/{post_id}"}]},
+            '_embedded': {'wp:term': [
+                [{'id': CATEGORIES.index(c) + 1, 'name': c, 'taxonomy': 'category'} for c in categories],
+                [{'id': 100 + TAGS.index(t), 'name': t, 'taxonomy': 'post_tag'} for t in rng.sample(TAGS, 2)],
+            ]},
+        }
+
+    def image(self, image_id):
+        seed = hashlib.sha256(str(image_id).encode()).digest()
+        return (seed * (self.image_size // len(seed) + 1))[:self.image_size]
+
+    def select_posts(self, query):
+        """Return the ids matching the after/modified_after filters, in order."""
+        ids = range(1, self.posts + 1)
+        if 'after' in query:
+            after = _parse_date(query['after'])
+            ids = [i for i in ids if FIRST_POST_DATE + timedelta(hours=7 * (i - 1)) > after]
+        if 'modified_after' in query:
+            modified_after = _parse_date(query['modified_after'])
+            ids = [i for i in ids if FIRST_POST_DATE + timedelta(hours=7 * (i - 1), days=1) > modified_after]
+        ids = list(ids)
+        if query.get('order', 'desc') == 'desc':
+            ids.reverse()
+        return ids
+
+    # Fault injection
+
+    def injected_fault(self):
+        """Return an error status to answer with, 'drop', or None."""
+        with self._lock:
+            self.stats['requests'] += 1
+            if self.rate_limit:
+                now = time.monotonic()
+                self._recent = [t for t in self._recent if now - t < 1.0]
+                if len(self._recent) >= self.rate_limit:
+                    self.stats['rate_limited'] += 1
+                    return 429
+                self._recent.append(now)
+            roll = self._random.random()
+            if roll < self.error_rate:
+                self.stats['errors'] += 1
+                return self._random.choice(self.error_statuses)
+            if roll < self.error_rate + self.drop_rate:
+                self.stats['dropped'] += 1
+                return 'drop'
+        return None
+
+
+def _parse_date(value):
+    return datetime.fromisoformat(value.replace('Z', '+00:00')).replace(tzinfo=None)
+
+
+def _make_handler(site):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+        # Headers and body are written separately; without this, keep-alive
+        # responses stall on delayed ACKs
+        disable_nagle_algorithm = True
+
+        def log_message(self, format, *args):
+            pass
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            delay = site.latency + (site.api_latency if url.path.startswith('/wp-json/') else 0)
+            if delay:
+                time.sleep(delay)
+            fault = site.injected_fault()
+            if fault not in (None, 'drop'):
+                self._send(fault, b'{"code":"fake_error"}',
+                           {'Retry-After': '1'} if fault in (429, 503) else None)
+                return
+
+            if url.path.startswith('/images/'):
+                try:
+                    body = site.image(int(url.path[len('/images/'):].split('.')[0]))
+                except ValueError:
+                    self._send(404, b'')
+                    return
+                self._send(200, body, {'Content-Type': 'image/jpeg'}, drop=fault == 'drop')
+            elif url.path.rstrip('/') == '/wp-json/wp/v2/posts':
+                self._posts(parse_qs(url.query), drop=fault == 'drop')
+            else:
+                self._send(404, b'{"code":"rest_no_route"}')
+
+        def _posts(self, params, drop):
+            query = {key: values[-1] for key, values in params.items()}
+            per_page = min(100, max(1, int(query.get('per_page', 10))))
+            page = max(1, int(query.get('page', 1)))
+            ids = site.select_posts(query)
+            total_pages = max(1, math.ceil(len(ids) / per_page))
+            if page > total_pages and ids:
+                self._send(400, b'{"code":"rest_post_invalid_page_number"}')
+                return
+
+            fields = set(query['_fields'].split(',')) if '_fields' in query else None
+            posts = []
+            for post_id in ids[(page - 1) * per_page:page * per_page]:
+                post = site.post(post_id)
+                posts.append({k: v for k, v in post.items() if k in fields} if fields else post)
+            body = json.dumps(posts).encode()
+
+            etag = '"' + hashlib.md5(body).hexdigest() + '"'
+            if self.headers.get('If-None-Match') == etag:
+                self._send(304, b'', {'ETag': etag})
+                return
+            self._send(200, body, {
+                'Content-Type': 'application/json; charset=UTF-8',
+                'X-WP-Total': str(len(ids)),
+                'X-WP-TotalPages': str(total_pages),
+                'ETag': etag,
+            }, drop=drop)
+
+        def _send(self, status, body, headers=None, drop=False):
+            self.send_response(status)
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            if status != 304:
+                self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            if drop:
+                # Promise the full body, send half, and hang up
+                body = body[:len(body) // 2]
+                self.close_connection = True
+            self.wfile.write(body)
+            with site._lock:
+                site.stats['bytes'] += len(body)
+
+    return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Serve a synthetic WordPress REST API locally')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--posts', type=int, default=1000)
+    parser.add_argument('--paragraphs', type=int, default=8)
+    parser.add_argument('--images-per-post', type=int, default=2)
+    parser.add_argument('--image-pool', type=int, default=50)
+    parser.add_argument('--image-size', type=int, default=20000)
+    parser.add_argument('--latency', type=float, default=0.0, help='Seconds added to every response')
+    parser.add_argument('--api-latency', type=float, default=0.0, help='Further seconds added to REST API responses')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Fraction of requests answered 500/503/429')
+    parser.add_argument('--drop-rate', type=float, default=0.0, help='Fraction of responses cut off mid-body')
+    parser.add_argument('--rate-limit', type=float, help='Requests per second before answering 429')
+    args = parser.parse_args()
+
+    site = FakeWordPress(posts=args.posts, paragraphs=args.paragraphs, images_per_post=args.images_per_post,
+                         image_pool=args.image_pool, image_size=args.image_size, latency=args.latency,
+                         api_latency=args.api_latency, error_rate=args.error_rate, drop_rate=args.drop_rate,
+                         rate_limit=args.rate_limit, port=args.port)
+    print(f"Fake WordPress site with {args.posts} posts at {site.url}")
+    print("Press Ctrl+C to stop.")
+    try:
+        site.server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        site.server.server_close()
+        print(f"\nServed: {site.stats}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,338 @@
+# HTML to Markdown conversion for the WordPress exporter
+import re
+from collections import namedtuple
+from html.parser import HTMLParser
+
+
+# Placeholder for an image link, resolved when the document is rendered
+ImageRef = namedtuple('ImageRef', ['src'])
+
+BLOCK_TAGS = {'p', 'div', 'section', 'article', 'header', 'footer', 'figure',
+              'figcaption', 'aside', 'main', 'nav', 'table', 'dl'}
+SKIP_TAGS = {'script', 'style', 'noscript', 'template'}
+HEADING_TAGS = {'h1': 1, 'h2': 2, 'h3': 3, 'h4': 4, 'h5': 5, 'h6': 6}
+
+EMPHASIS_TAGS = {'strong': '**', 'b': '**', 'em': '*', 'i': '*', 'del': '~~', 's': '~~', 'strike': '~~'}
+
+_WHITESPACE = re.compile(r'\s+')
+_MARKDOWN_SPECIAL = re.compile(r'([\\`*_\[\]<])')
+# Text that would start a heading, list or quote at the beginning of a line
+_BLOCK_MARKER = re.compile(r'^(?:(#)|(\d{1,9})([.)])(?=\s|$)|([-+])(?=\s|$)|(>))')
+_BACKTICKS = re.compile(r'`+')
+
+
+class MarkdownDocument:
+    """Result of a conversion: Markdown text with image links left open.
+
+    `images` lists every image source in document order. render() fills in
+    the image links, so images can be downloaded between parsing and
+    rendering without parsing or rewriting the text again.
+    """
+
+    def __init__(self, parts, images):
+        self.parts = parts
+        self.images = images
+
+    def render(self, resolve_image=None):
+        """Join the document, mapping each image src through resolve_image."""
+        out = []
+        for part in self.parts:
+            if isinstance(part, ImageRef):
+                link = resolve_image(part.src) if resolve_image else None
+                out.append(_escape_url(link or part.src))
+            else:
+                out.append(part)
+        return ''.join(out).strip() + '\n'
+
+
+def _escape_text(text):
+    return _MARKDOWN_SPECIAL.sub(r'\\\1', text)
+
+
+def _escape_line_start(text):
+    """Escape a marker that would make a line a heading, list item or quote."""
+    match = _BLOCK_MARKER.match(text)
+    if not match:
+        return text
+    if match.group(2):
+        return f"{match.group(2)}\\{text[match.end(2):]}"
+    return '\\' + text
+
+
+def _escape_url(url):
+    return url.replace(' ', '%20').replace('(', '%28').replace(')', '%29')
+
+
+class _MarkdownParser(HTMLParser):
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.parts = []
+        self.images = []
+        self._started = False
+        self._newlines = 0       # Line breaks owed before the next output
+        self._gap_depth = 0      # Quote depth of the blank lines owed
+        self._line_start = True
+        self._quote_depth = 0
+        self._lists = []         # Stack of [tag, item counter]
+        self._list_marker = None  # Marker for the next line of a list item
+        self._pre = 0
+        self._code = 0
+        self._code_start = 0     # Index of the opening backtick of inline code
+        self._code_marks = []    # Emphasis the opening backtick put out
+        self._pending_marks = [] # Emphasis opened but not yet followed by text
+        self._skip = 0
+        self._links = []         # href of every open <a>, or None
+        self._table_row = 0
+        self._row_cells = 0
+        self._in_cell = False
+
+    # Output helpers
+
+    def _break(self, count):
+        if self._newlines:
+            self._gap_depth = min(self._gap_depth, self._quote_depth)
+        else:
+            self._gap_depth = self._quote_depth
+        self._newlines = max(self._newlines, count)
+
+    def _line_prefix(self):
+        prefix = '> ' * self._quote_depth
+        if self._list_marker is not None:
+            prefix += '    ' * (len(self._lists) - 1) + self._list_marker
+            self._list_marker = None
+        elif self._lists:
+            prefix += '    ' * len(self._lists)
+        return prefix
+
+    def _emit(self, text, open_marks=True):
+        if not text:
+            return
+        if open_marks and self._pending_marks:
+            # Emphasis markers go right before the first visible content
+            marks = ''.join(self._pending_marks)
+            self._pending_marks = []
+            self._emit(marks)
+        if self._newlines and self._started:
+            # Blank lines inside a quote keep the quote marker
+            blank = ('> ' * self._gap_depth).rstrip() + '\n'
+            self.parts.append('\n' + blank * (self._newlines - 1))
+            self._line_start = True
+        self._newlines = 0
+        if self._line_start:
+            self.parts.append(self._line_prefix())
+            self._line_start = False
+        self.parts.append(text)
+        self._started = True
+
+    # Parser callbacks
+
+    def handle_starttag(self, tag, attrs):
+        if tag in SKIP_TAGS:
+            self._skip += 1
+            return
+        if self._skip:
+            return
+        attrs = dict(attrs)
+
+        if tag in HEADING_TAGS:
+            self._break(2)
+            self._emit('#' * HEADING_TAGS[tag] + ' ')
+        elif tag in BLOCK_TAGS:
+            self._break(2)
+        elif tag == 'br':
+            if self._started and not self._line_start:
+                self.parts.append('  ')
+            self._break(1)
+        elif tag == 'hr':
+            self._break(2)
+            self._emit('---')
+            self._break(2)
+        elif tag in EMPHASIS_TAGS:
+            if not self._pre and not self._code:
+                self._pending_marks.append(EMPHASIS_TAGS[tag])
+        elif tag == 'code' and not self._pre:
+            if not self._code:
+                self._code_marks = self._pending_marks
+                self._emit('`')
+                self._code_start = len(self.parts) - 1
+            self._code += 1
+        elif tag == 'pre':
+            self._break(2)
+            self._emit('```')
+            self._break(1)
+            self._pre += 1
+        elif tag == 'blockquote':
+            self._break(2)
+            self._quote_depth += 1
+        elif tag in ('ul', 'ol'):
+            self._break(1 if self._lists else 2)
+            self._lists.append([tag, 0])
+        elif tag == 'li':
+            self._break(1)
+            if self._lists:
+                current = self._lists[-1]
+                current[1] += 1
+                self._list_marker = f"{current[1]}. " if current[0] == 'ol' else '- '
+        elif tag == 'a':
+            href = attrs.get('href')
+            self._links.append(href)
+            if href:
+                self._emit('[')
+        elif tag == 'img':
+            src = attrs.get('src')
+            if src:
+                self.images.append(src)
+                alt = _escape_text(_WHITESPACE.sub(' ', attrs.get('alt') or '').strip())
+                self._emit(f"![{alt}](")
+                self.parts.append(ImageRef(src))
+                self.parts.append(')')
+        elif tag == 'iframe':
+            src = attrs.get('src')
+            if src:
+                self._break(2)
+                self._emit(f"[Embedded content]({_escape_url(src)})")
+                self._break(2)
+        elif tag == 'tr':
+            self._break(1)
+            self._row_cells = 0
+        elif tag in ('td', 'th'):
+            self._emit('| ' if self._row_cells == 0 else ' | ')
+            self._row_cells += 1
+            self._in_cell = True
+
+    def handle_endtag(self, tag):
+        if tag in SKIP_TAGS:
+            self._skip = max(0, self._skip - 1)
+            return
+        if self._skip:
+            return
+
+        if tag in HEADING_TAGS or tag in BLOCK_TAGS:
+            self._break(2)
+        elif tag in EMPHASIS_TAGS:
+            if not self._pre and not self._code:
+                self._close_mark(EMPHASIS_TAGS[tag])
+        elif tag == 'code' and not self._pre and self._code:
+            self._code -= 1
+            if not self._code:
+                self._close_code()
+        elif tag == 'pre' and self._pre:
+            self._pre -= 1
+            self._break(1)
+            self._emit('```')
+            self._break(2)
+        elif tag == 'blockquote' and self._quote_depth:
+            self._quote_depth -= 1
+            self._break(2)
+        elif tag in ('ul', 'ol') and self._lists:
+            self._lists.pop()
+            self._break(1 if self._lists else 2)
+        elif tag == 'li':
+            self._break(1)
+        elif tag == 'a' and self._links:
+            href = self._links.pop()
+            if href:
+                self._emit(f"]({_escape_url(href)})")
+        elif tag in ('td', 'th'):
+            self._in_cell = False
+        elif tag == 'tr':
+            self._in_cell = False
+            if self._row_cells:
+                self._emit(' |')
+                # Markdown tables need a separator after the first row
+                if self._table_row == 0:
+                    self._break(1)
+                    self._emit('|' + ' --- |' * self._row_cells)
+                self._table_row += 1
+            self._break(1)
+        elif tag == 'table':
+            self._table_row = 0
+
+    def _close_mark(self, mark):
+        if mark in self._pending_marks:
+            # Nothing visible inside; drop the pair
+            self._pending_marks.reverse()
+            self._pending_marks.remove(mark)
+            self._pending_marks.reverse()
+            return
+        # "**bold **" does not render; move the spaces after the marker
+        trailing = ''
+        if self._started and isinstance(self.parts[-1], str):
+            text = self.parts[-1].rstrip(' ')
+            trailing = self.parts[-1][len(text):]
+            self.parts[-1] = text
+        self.parts.append(mark + trailing)
+
+    def _close_code(self):
+        if len(self.parts) == self._code_start + 1:
+            # Nothing inside; a lone "``" would show as backticks
+            del self.parts[self._code_start]
+            if self._code_marks:
+                # Emphasis opened right before is still empty
+                del self.parts[self._code_start - 1]
+                self._pending_marks = self._code_marks
+            return
+        content = ''.join(part for part in self.parts[self._code_start + 1:] if isinstance(part, str))
+        runs = _BACKTICKS.findall(content)
+        if runs:
+            # Fence code containing backticks with a longer run of them
+            fence = '`' * (max(len(run) for run in runs) + 1)
+            self.parts[self._code_start] = fence + ' '
+            self.parts.append(' ' + fence)
+        else:
+            self.parts.append('`')
+
+    def _escape_cell(self, text):
+        # A bare | would end the table cell, even inside code
+        return text.replace('|', '\\|') if self._in_cell else text
+
+    def handle_data(self, data):
+        if self._skip:
+            return
+        if self._pre:
+            for i, line in enumerate(data.split('\n')):
+                if i:
+                    self.parts.append('\n')
+                    self._line_start = True
+                self._emit(line)
+            return
+
+        text = _WHITESPACE.sub(' ', data)
+        at_line_start = self._line_start or self._newlines
+        if at_line_start:
+            text = text.lstrip()
+        if self._code:
+            self._emit(self._escape_cell(text))
+            return
+        # Leading spaces stay outside emphasis that opens here
+        content = text.lstrip(' ')
+        self._emit(text[:len(text) - len(content)], open_marks=False)
+        content = self._escape_cell(_escape_text(content))
+        if at_line_start and not self._pending_marks:
+            content = _escape_line_start(content)
+        self._emit(content)
+
+
+class _TextParser(HTMLParser):
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.text = []
+
+    def handle_data(self, data):
+        self.text.append(data)
+
+
+def html_to_markdown(html):
+    """Convert rendered WordPress HTML to a MarkdownDocument in one pass."""
+    parser = _MarkdownParser()
+    parser.feed(html)
+    parser.close()
+    return MarkdownDocument(parser.parts, parser.images)
+
+
+def html_to_text(html):
+    """Convert an HTML fragment such as a post title to plain text."""
+    parser = _TextParser()
+    parser.feed(html)
+    parser.close()
+    return _WHITESPACE.sub(' ', ''.join(parser.text)).strip()
@@ -0,0 +1,129 @@
+# Full-text search over exported WordPress posts
+import argparse
+import os
+import re
+import sqlite3
+import sys
+
+
+# Index file kept next to .images and .export-state.json in an export folder
+INDEX_NAME = '.search.db'
+
+# Front matter and title heading written by create_markdown_content
+_HEADER = re.compile(r'\A---\n.*?\n---\n+(?:# [^\n]*\n+)?', re.DOTALL)
+_IMAGE = re.compile(r'!\[([^\]]*)\]\([^)]*\)')
+_LINK = re.compile(r'\[([^\]]*)\]\([^)]*\)')
+_MARKUP = re.compile(r'[\\`*_#>|~]+')
+_WHITESPACE = re.compile(r'\s+')
+_QUERY_TERM = re.compile(r'\w+')
+
+
+def markdown_to_text(markdown):
+    """Strip Markdown syntax, keeping link and image text."""
+    text = _IMAGE.sub(r'\1', markdown)
+    text = _LINK.sub(r'\1', text)
+    return _WHITESPACE.sub(' ', _MARKUP.sub(' ', text)).strip()
+
+
+class SearchIndex:
+    """SQLite FTS5 index of post titles and bodies.
+
+    Posts are keyed by their WordPress id, so re-indexing an updated or
+    renamed post replaces its entry. Writes are batched; call commit() to
+    make them durable and close() when done.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.created = not os.path.exists(path)
+        self._db = sqlite3.connect(path)
+        self._db.execute(
+            "CREATE VIRTUAL TABLE IF NOT EXISTS posts USING fts5("
+            "title, body, categories, path UNINDEXED, date UNINDEXED, "
+            "tokenize='porter unicode61')"
+        )
+
+    def add(self, post_id, path, title, date, categories, markdown):
+        """Index one post from its Markdown body."""
+        self._db.execute("DELETE FROM posts WHERE rowid = ?", (int(post_id),))
+        self._db.execute(
+            "INSERT INTO posts(rowid, title, body, categories, path, date) VALUES (?, ?, ?, ?, ?, ?)",
+            (int(post_id), title, markdown_to_text(markdown), ' '.join(categories), path, date)
+        )
+
+    def commit(self):
+        self._db.commit()
+
+    def optimize(self):
+        """Merge the index into a single compact b-tree."""
+        self._db.execute("INSERT INTO posts(posts) VALUES ('optimize')")
+        self._db.commit()
+
+    def search(self, query, limit=20):
+        """Return (title, date, path, snippet) tuples for the best matches.
+
+        `query` uses FTS5 syntax (AND, OR, NOT, "phrases", prefix*); if it is
+        not valid FTS5 its words are searched for as plain terms instead.
+        Title matches rank above body matches.
+        """
+        sql = ("SELECT title, date, path, snippet(posts, 1, '**', '**', '...', 12) "
+               "FROM posts WHERE posts MATCH ? ORDER BY bm25(posts, 10.0, 1.0, 2.0) LIMIT ?")
+        try:
+            return self._db.execute(sql, (query, limit)).fetchall()
+        except sqlite3.OperationalError:
+            terms = ' '.join(f'"{term}"' for term in _QUERY_TERM.findall(query))
+            if not terms:
+                return []
+            return self._db.execute(sql, (terms, limit)).fetchall()
+
+    def close(self):
+        self._db.commit()
+        self._db.close()
+
+
+def index_exported_posts(index, output, posts):
+    """Index posts that were exported before the index existed.
+
+    `posts` maps post id to the entries kept in the export state (path,
+    title, date and categories); each body is read back through `output`,
+    the export's output backend.
+    """
+    count = 0
+    for post_id, entry in posts.items():
+        text = output.read(entry['path'])
+        if text is None:
+            continue
+        markdown = _HEADER.sub('', text)
+        index.add(post_id, entry['path'], entry['title'], entry['date'], entry['categories'], markdown)
+        count += 1
+    index.commit()
+    return count
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Search posts exported by ExportWordpressToGithub.py')
+    parser.add_argument('export_dir', help='Export folder of one site (contains .search.db)')
+    parser.add_argument('query', nargs='+', help='Search terms, in SQLite FTS5 query syntax')
+    parser.add_argument('-n', '--limit', type=int, default=20, help='Maximum number of results')
+    args = parser.parse_args()
+
+    index_path = os.path.join(args.export_dir, INDEX_NAME)
+    if not os.path.exists(index_path):
+        print(f"No search index in {args.export_dir}. Export with --search-index first.")
+        sys.exit(1)
+
+    index = SearchIndex(index_path)
+    results = index.search(' '.join(args.query), args.limit)
+    index.close()
+
+    if not results:
+        print("No matching posts.")
+        return
+    for title, date, path, snippet in results:
+        print(f"{title} ({date})")
+        print(f"  {path}")
+        print(f"  {snippet}\n")
+
+
+if __name__ == "__main__":
+    main()